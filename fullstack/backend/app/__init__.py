@@ -36,6 +36,9 @@ def create_app():
     from app.routes.resultsView import results_bp
     app.register_blueprint(results_bp)
 
+    from app.routes.jobs import jobs_bp
+    app.register_blueprint(jobs_bp)
+
     from app.routes.cron_job import cron_bp
     app.register_blueprint(cron_bp)
     
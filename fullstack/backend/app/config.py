@@ -21,4 +21,52 @@ class Config:
     SESSION_COOKIE_SECURE = True 
     SESSION_COOKIE_SAMESITE = "None"
     FRONTEND_URL = os.getenv("FRONTEND_URL")
-    ALGORITHM = "HS256"
\ No newline at end of file
+    ALGORITHM = "HS256"
+    MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", 8))
+    # "stored" serves with DataSet.best_k; "tune" re-runs calculate_k when a model is loaded
+    KNN_SERVING_MODE = os.getenv("KNN_SERVING_MODE", "stored")
+    # Approximate: train on unique answer profiles weighted by their count instead
+    # of every row. Faster on datasets with many repeated profiles, but votes can
+    # differ from the full dataset when neighbors tie at the k-th distance.
+    KNN_APPROX_COLLAPSE_DUPLICATES = os.getenv("KNN_APPROX_COLLAPSE_DUPLICATES", "false").lower() == "true"
+    # Neighbor search backend for single predictions: "sklearn" or "grid".
+    # Batch scoring always uses sklearn. Both give the same recommendations;
+    # queries whose k-th neighbor ties with the next one are answered by sklearn.
+    KNN_ENGINE = os.getenv("KNN_ENGINE", "sklearn")
+    # Print tuning tables and per-prediction traces to stdout
+    KNN_VERBOSE = os.getenv("KNN_VERBOSE", "false").lower() == "true"
+    # Candidate k range searched by KNN.calculate_k
+    KNN_K_MIN = int(os.getenv("KNN_K_MIN", 5))
+    KNN_K_MAX = int(os.getenv("KNN_K_MAX", 10))
+    # Cross-validation folds are spread over joblib workers; neighbor queries
+    # release the GIL, so threads avoid copying the dataset into subprocesses.
+    TUNING_N_JOBS = int(os.getenv("TUNING_N_JOBS", -1))
+    TUNING_BACKEND = os.getenv("TUNING_BACKEND", "threading")
+    # Local directory for per-dataset files (recommendation lookup tables)
+    DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", "dataset_store")
+    LOOKUP_TABLE_MAX_CELLS = int(os.getenv("LOOKUP_TABLE_MAX_CELLS", 4_000_000))
+    # Rows parsed and scored per step of a file upload import
+    IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", 5000))
+    # Data rows per executemany insert, or stream them with PostgreSQL COPY instead
+    IMPORT_INSERT_BATCH = int(os.getenv("IMPORT_INSERT_BATCH", 10000))
+    IMPORT_USE_COPY = os.getenv("IMPORT_USE_COPY", "true").lower() == "true"
+    # /datasets/<id>/records: default and largest page, and rows per chunk when streaming
+    RECORDS_PAGE_SIZE = int(os.getenv("RECORDS_PAGE_SIZE", 100))
+    RECORDS_MAX_PAGE = int(os.getenv("RECORDS_MAX_PAGE", 1000))
+    RECORDS_STREAM_BATCH = int(os.getenv("RECORDS_STREAM_BATCH", 2000))
+    # A results_id gap whose next row is younger than this holds back the
+    # summary watermark, since its result may not have committed yet
+    RESULTS_SUMMARY_SETTLE_MINUTES = int(os.getenv("RESULTS_SUMMARY_SETTLE_MINUTES", 10))
+    # /results/ keyset pages: default and largest page
+    RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", 50))
+    RESULTS_MAX_PAGE = int(os.getenv("RESULTS_MAX_PAGE", 500))
+    # Results read per server-side cursor batch by /results/export
+    RESULTS_EXPORT_BATCH = int(os.getenv("RESULTS_EXPORT_BATCH", 5000))
+    # Store new results' neighbors packed on the results row instead of as
+    # neighbors rows (migrations.compact_neighbors packs the existing ones)
+    RESULTS_COMPACT_NEIGHBORS = os.getenv("RESULTS_COMPACT_NEIGHBORS", "false").lower() == "true"
+    # Rendered GET payloads kept for ETag-validated reuse (per web process)
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 128))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    # Threads per web process running background import/retune jobs
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
\ No newline at end of file
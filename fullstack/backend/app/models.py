@@ -95,6 +95,7 @@ class DataSet(db.Model):
 
     # Relationships
     data = db.relationship("Data", backref="data_set", cascade="all, delete-orphan")
+    evaluation = db.relationship("DataSetEvaluation", backref="data_set", uselist=False, cascade="all, delete-orphan")
     
     def data_set_info(self):
         return {
@@ -111,6 +112,82 @@ class DataSet(db.Model):
 
 
 
+# -------------------- DataSet Evaluation --------------------
+class DataSetEvaluation(db.Model):
+    __tablename__ = "data_set_evaluation"
+
+    evaluation_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    data_set_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("data_set.data_set_id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    report = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    last_updated = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+
+    def evaluation_info(self):
+        return {
+            "data_set_id": self.data_set_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
+            **self.report,
+        }
+
+
+# -------------------- Tuning Cache --------------------
+class TuningCache(db.Model):
+    __tablename__ = "tuning_cache"
+
+    tuning_cache_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)
+    question_set_id = db.Column(db.BigInteger, nullable=False)
+    best_k = db.Column(db.BigInteger, nullable=False)
+    accuracy = db.Column(db.Float, nullable=False)
+    report = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    last_updated = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now(), nullable=False)
+
+
+# -------------------- Job --------------------
+class Job(db.Model):
+    __tablename__ = "job"
+
+    job_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    kind = db.Column(db.Text, nullable=False)
+    status = db.Column(db.Text, nullable=False, default="Queued")  # Queued, Running, Succeeded, Failed
+    phase = db.Column(db.Text, nullable=False, default="queued")
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    data_set_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("data_set.data_set_id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    timings = db.Column(db.JSON, nullable=False, default=dict)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    def job_info(self):
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "progress": self.progress,
+            "data_set_id": self.data_set_id,
+            "timings": self.timings,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
 # -------------------- Data --------------------
 class Data(db.Model):
     __tablename__ = "data"
@@ -231,6 +308,9 @@ class Results(db.Model):
     )
     recommended_strand = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    # Neighbors packed as fixed-width records (see services/neighbor_packing);
+    # NULL when they live in the neighbors table instead
+    neighbors_packed = db.Column(db.LargeBinary, nullable=True)
 
     # Relationships
     neighbors = db.relationship("Neighbors", back_populates="result", cascade="all, delete-orphan")
@@ -300,4 +380,42 @@ class TieTable(db.Model):
             "abm_weight": self.abm_weight,
             "results_id": self.results_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
\ No newline at end of file
+        }
+
+
+# -------------------- Results Summary --------------------
+class ResultsSummary(db.Model):
+    """Pre-aggregated results per day, dataset, course and recommended strand, kept current by /cron."""
+    __tablename__ = "results_summary"
+    __table_args__ = (
+        UniqueConstraint("day", "data_set_id", "course_id", "recommended_strand", name="uq_results_summary_group"),
+    )
+
+    results_summary_id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    day = db.Column(db.Date, nullable=True)
+    data_set_id = db.Column(db.BigInteger, nullable=True)
+    course_id = db.Column(db.BigInteger, nullable=True)
+    recommended_strand = db.Column(db.Text, nullable=False)
+    result_count = db.Column(db.BigInteger, nullable=False, default=0)
+    tie_count = db.Column(db.BigInteger, nullable=False, default=0)
+    stem_score_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    humss_score_sum = db.Column(db.BigInteger, nullable=False, default=0)
+    abm_score_sum = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class ResultsSummaryState(db.Model):
+    """Single row holding the highest results_id already folded into results_summary."""
+    __tablename__ = "results_summary_state"
+
+    results_summary_state_id = db.Column(db.Integer, primary_key=True)
+    last_results_id = db.Column(db.BigInteger, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+
+# -------------------- Cache Version --------------------
+class CacheVersion(db.Model):
+    """Generation counter per cached resource, bumped by its write endpoints so every worker's ETags change."""
+    __tablename__ = "cache_version"
+
+    resource = db.Column(db.Text, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -1,12 +1,17 @@
 from flask import Blueprint, jsonify, request
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app import db
 from app.models import Course
+from app.services.http_cache import conditional, bump_version
 
 course_bp = Blueprint("course_bp", __name__, url_prefix="/courses")
 
+def courses_version():
+    return [select(func.count(Course.course_id)), select(func.max(Course.course_id))]
+
 # Get all courses
 @course_bp.route("/", methods=["GET"])
+@conditional("courses", courses_version)
 def get_courses():
     courses = Course.query.order_by(Course.course_name.asc()).all()
     return jsonify([c.course_info() for c in courses]), 200
@@ -29,6 +34,7 @@ def create_course():
 
     new_course = Course(course_name=formatted_name)
     db.session.add(new_course)
+    bump_version("courses")
     db.session.commit()
     return jsonify(new_course.course_info()), 201
 
@@ -53,6 +59,7 @@ def update_course(course_id):
         return jsonify({"error": f'Another course named "{formatted_name}" already exists.'}), 400
 
     course.course_name = formatted_name
+    bump_version("courses")
     db.session.commit()
     return jsonify(course.course_info()), 200
 
@@ -61,5 +68,6 @@ def update_course(course_id):
 def delete_course(course_id):
     course = Course.query.get_or_404(course_id)
     db.session.delete(course)
+    bump_version("courses")
     db.session.commit()
     return jsonify({"message": "Course deleted successfully"}), 200
@@ -1,10 +1,18 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.services.results_summary import refresh_results_summary
 import datetime
 
 cron_bp = Blueprint("cron", __name__)
 
 @cron_bp.route("/cron", methods=["GET"])
 def run_cron_task():
-    # Replace with your real task
+    # Fold new results into the summary table; ?full=true rebuilds it
     print("Cron task executed at", datetime.datetime.now())
-    return jsonify({"message": "Cron task executed"}), 200
\ No newline at end of file
+    try:
+        summary = refresh_results_summary(full=request.args.get("full", "false").lower() == "true")
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"message": "Cron task executed", "results_summary": summary}), 200
\ No newline at end of file
@@ -1,38 +1,231 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from app import db
-from app.models import db, DataSet, Data, Question, QuestionSet
-from sqlalchemy.exc import SQLAlchemyError
+from app.models import db, DataSet, DataSetEvaluation, TuningCache, Data, QuestionSet
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from app.services.model_registry import model_registry, load_training_data
+from app.services.lookup_table import build_lookup_table, drop_lookup_table, lookup
+from app.services.snapshot import snapshot_import, drop_snapshot
+from app.services.question_index import question_index
+from app.services.http_cache import conditional, bump_version
+from app.services.dataset_import import (
+    ScoringPlan, check_header, strand_column, read_upload, score_upload, save_upload, open_saved_upload,
+    bulk_insert_data, import_sample, content_hash,
+)
+from app.services.jobs import submit_job, NoProgress
+from app.services.tuning import check_folds
+from app.services.dataset_records import record_fields, fetch_records, fetch_page, stream_records, STREAM_TYPES
+from app.config import Config
 import pandas as pd
+import math
+import os
 
 dataset_bp = Blueprint("datasets", __name__)
 
-def normalize(text):
-    """Utility to clean question text for reliable matching."""
-    if not text:
-        return ""
+def refresh_lookup_table(dataset):
+    """Rebuild the precomputed recommendation table; serving falls back to the model if this fails."""
+    try:
+        build_lookup_table(dataset, model_registry.get(dataset))
+    except Exception as e:
+        drop_lookup_table(dataset.data_set_id)
+        print(f"⚠️ Could not build lookup table for dataset {dataset.data_set_id}:", str(e))
+
+def save_snapshot(dataset, features, labels):
+    """Write the columnar snapshot of freshly imported rows; a failed write is rebuilt from Data on first load."""
+    try:
+        snapshot_import(dataset.data_set_id, features, labels)
+    except Exception as e:
+        drop_snapshot(dataset.data_set_id)
+        print(f"⚠️ Could not write snapshot for dataset {dataset.data_set_id}:", str(e))
+
+def save_evaluation(dataset, report):
+    """Keep the latest tuning report of a dataset (one row per dataset)."""
+    if dataset.evaluation is None:
+        dataset.evaluation = DataSetEvaluation(report=report)
+    else:
+        dataset.evaluation.report = report
+
+def remember_tuning(digest, question_set_id, best_k, accuracy, report):
+    """Store a k search result under the content hash of the rows it was run on."""
+    cached = TuningCache.query.filter_by(content_hash=digest).all()
+    for entry in cached:
+        entry.best_k, entry.accuracy, entry.report = best_k, accuracy, report
+    if not cached:
+        db.session.add(TuningCache(
+            content_hash=digest,
+            question_set_id=question_set_id,
+            best_k=best_k,
+            accuracy=accuracy,
+            report=report,
+        ))
+
+def apply_tuning(dataset, X, y):
+    """Store best_k, accuracy and the report for the imported rows.
+
+    Rows identical to an earlier import (same question set, rows and labels)
+    reuse its stored result instead of running the k search again.
+    """
+    from app.services.KNN import KNN
+
+    try:
+        check_folds(y)
+    except ValueError:
+        # Too few rows to cross-validate; keep the defaults until a retune can run
+        dataset.best_k = 5
+        dataset.accuracy = 1.0
+        return
+
+    digest = content_hash(dataset.question_set_id, X, y)
+    cached = TuningCache.query.filter_by(content_hash=digest).first()
+    if cached is not None:
+        print(f"♻️ Reusing tuning of an identical import — K={cached.best_k}, Accuracy={cached.accuracy:.2f}")
+        dataset.best_k = cached.best_k
+        dataset.accuracy = cached.accuracy
+        save_evaluation(dataset, cached.report)
+        return
+
+    knn_runner = KNN(None, X, y)
+    best_k, accuracy, results, report = knn_runner.calculate_k()
+    dataset.best_k = best_k
+    dataset.accuracy = float(accuracy)
+    save_evaluation(dataset, report)
+    remember_tuning(digest, dataset.question_set_id, best_k, dataset.accuracy, report)
+
+def wants_async():
+    """?async=true queues the work as a job and answers 202 with the job instead of waiting."""
+    return request.args.get("async", "false").lower() == "true"
+
+def is_sample(value):
+    """A [stem_score, abm_score, humss_score] row of three finite numbers."""
     return (
-        text.strip()
-        .replace("&", "and")    # unify symbols
-        .replace("  ", " ")     # collapse double spaces
-        .lower()                # ignore case
+        isinstance(value, list)
+        and len(value) == 3
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in value)
     )
 
+DUPLICATE_NAME = "A dataset with this name already exists."
+
+def run_import(progress, fields, score_rows):
+    """Score, tune, then write the dataset with its rows and evaluation in one commit.
+
+    Tuning runs before anything is written, so a failed import leaves no
+    partial dataset behind. Returns the dataset, features and labels.
+    """
+    # A queued import may find its name taken by then; fail before the work
+    if DataSet.query.filter_by(data_set_name=fields["data_set_name"]).first():
+        raise ValueError(DUPLICATE_NAME)
+
+    progress.phase("scoring", 0.05)
+    features, labels = score_rows()
+    if not labels:
+        raise ValueError("The uploaded file has no data rows")
+    print(f"✅ Successfully processed {len(labels)} rows with strand labels")
+
+    progress.phase("tuning", 0.3)
+    dataset = DataSet(**fields, best_k=0, accuracy=0.0)
+    apply_tuning(dataset, features, labels)
+
+    progress.phase("saving", 0.8)
+    db.session.add(dataset)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        # Another import took the name between the check and the insert
+        if DataSet.query.filter_by(data_set_name=fields["data_set_name"]).first():
+            raise ValueError(DUPLICATE_NAME)
+        raise
+    bulk_insert_data(dataset.data_set_id, features, labels)
+    bump_version("datasets")
+    db.session.commit()
+    model_registry.invalidate(dataset.data_set_id)
+
+    progress.phase("snapshot", 0.9)
+    save_snapshot(dataset, features, labels)
+
+    progress.phase("lookup_table", 0.95)
+    refresh_lookup_table(dataset)
+
+    print(f"✅ Import complete — K={dataset.best_k}, Accuracy={dataset.accuracy:.2f}")
+    return dataset, features, labels
+
+def import_job(progress, fields, score_rows):
+    dataset, features, labels = run_import(progress, fields, score_rows)
+    return {
+        "data_set_id": dataset.data_set_id,
+        "best_k": dataset.best_k,
+        "accuracy": dataset.accuracy,
+        "rows_imported": len(labels),
+    }
+
+def upload_job(progress, fields, path, db_questions):
+    def score_rows():
+        with open_saved_upload(path) as (header, rows):
+            return score_upload(header, rows, db_questions)
+
+    try:
+        return import_job(progress, fields, score_rows)
+    finally:
+        os.remove(path)
+
+def run_retune(progress, data_set_id):
+    """Re-run the k search on a dataset's stored rows and publish the new model."""
+    from app.services.KNN import KNN
+
+    progress.phase("loading", 0.05)
+    dataset = db.session.get(DataSet, data_set_id)
+    X, y = load_training_data(data_set_id)
+
+    progress.phase("tuning", 0.2)
+    best_k, accuracy, results, report = KNN(None, X, y).calculate_k()
+
+    # Progress is written on a separate connection; report it before this
+    # session starts writing, or SQLite's write lock would block it.
+    progress.phase("saving", 0.9)
+    dataset.best_k = best_k
+    dataset.accuracy = float(accuracy)
+    save_evaluation(dataset, report)
+    remember_tuning(content_hash(dataset.question_set_id, X, y), dataset.question_set_id, best_k, dataset.accuracy, report)
+    bump_version("datasets")
+    db.session.commit()
+    model_registry.invalidate(data_set_id)
+    refresh_lookup_table(dataset)
+
+    print(f"✅ Retuned dataset {data_set_id} — K={dataset.best_k}, Accuracy={dataset.accuracy:.2f}")
+    return dataset
+
+def retune_job(progress, data_set_id):
+    dataset = run_retune(progress, data_set_id)
+    return {"data_set_id": data_set_id, "best_k": dataset.best_k, "accuracy": dataset.accuracy}
+
+def datasets_version():
+    return [select(func.count(DataSet.data_set_id)), select(func.max(DataSet.last_updated))]
+
 # Get all datasets
 @dataset_bp.route("/datasets", methods=["GET"])
+@conditional("datasets", datasets_version)
 def get_datasets():
-
+    """Datasets with their row counts in one grouped query, optionally filtered by question_set_id and status."""
     try:
-        datasets = DataSet.query.all()
-        response = []
-        for ds in datasets:
-            print("Loaded dataset:", ds)  
-            rows_count = Data.query.filter_by(data_set_id=ds.data_set_id).count()
-            print("Rows count:", rows_count)
-            print("DataSet info:", ds.data_set_info()) 
-            response.append({
-                **ds.data_set_info(),
-                "rows": rows_count
-            })
+        row_counts = (
+            db.session.query(Data.data_set_id, func.count(Data.data_id).label("rows"))
+            .group_by(Data.data_set_id)
+            .subquery()
+        )
+        query = (
+            db.session.query(DataSet, func.coalesce(row_counts.c.rows, 0))
+            .outerjoin(row_counts, row_counts.c.data_set_id == DataSet.data_set_id)
+            .order_by(DataSet.data_set_id)
+        )
+
+        question_set_id = request.args.get("question_set_id", type=int)
+        if question_set_id is not None:
+            query = query.filter(DataSet.question_set_id == question_set_id)
+        status = request.args.get("status")
+        if status:
+            query = query.filter(DataSet.status == status)
+
+        response = [{**ds.data_set_info(), "rows": rows_count} for ds, rows_count in query]
         return jsonify(response), 200
     except Exception as e:  
         print("❌ ERROR in /datasets:", str(e))
@@ -46,7 +239,7 @@ def import_dataset():
         dataset_name = data.get("dataset_name")
 
         if DataSet.query.filter_by(data_set_name=dataset_name).first():
-            return jsonify({"error": "A dataset with this name already exists."}), 409
+            return jsonify({"error": DUPLICATE_NAME}), 409
         
         description = data.get("description")
         question_set_id = data.get("question_set_id")
@@ -65,24 +258,14 @@ def import_dataset():
         print(f"➡️ Columns in first row: {list(rows[0].keys())}")
 
         # --- Fetch questions from DB ---
-        questions = Question.query.filter_by(set_id=question_set_id).all()
-        print(f"📚 Questions found in DB for set {question_set_id}: {len(questions)}")
-
-        if not questions:
+        db_questions = question_index(question_set_id)
+        if not db_questions:
             return jsonify({"error": "No questions found for this question set"}), 400
 
-        db_questions = {normalize(q.question_text): q.strand for q in questions}
-        print(f"🧩 Normalized DB questions: {list(db_questions.keys())[:5]} ...")
-
-        # --- Normalize file columns ---
-        file_questions = [q for q in rows[0].keys() if normalize(q) != "strand"]
-        norm_file_questions = {normalize(q) for q in file_questions}
-        print(f"📄 Questions found in file: {len(norm_file_questions)}")
-        print(f"🧠 Normalized file questions sample: {list(norm_file_questions)[:5]}")
+        print(f"📚 Questions found in DB for set {question_set_id}: {len(db_questions)}")
 
         # --- Check mismatches ---
-        missing_in_file = set(db_questions.keys()) - norm_file_questions
-        extra_in_file = norm_file_questions - set(db_questions.keys())
+        missing_in_file, extra_in_file = check_header(rows[0].keys(), db_questions)
 
         print(f"⚠️ Missing questions in file: {len(missing_in_file)}")
         print(f"⚠️ Extra questions in file: {len(extra_in_file)}")
@@ -102,88 +285,139 @@ def import_dataset():
             print(f"⚠️ Ignoring {len(extra_in_file)} extra question(s) not in DB: {list(extra_in_file)[:5]}")
 
         # --- Continue import only if everything is valid ---
-        dataset = DataSet(
-            data_set_name=dataset_name,
-            data_set_description=description,
-            question_set_id=question_set_id,
-            best_k=0,
-            accuracy=0.0
-        )
-        db.session.add(dataset)
-        db.session.flush()
+        fields = {
+            "data_set_name": dataset_name,
+            "data_set_description": description,
+            "question_set_id": question_set_id,
+        }
+        plan = ScoringPlan(list(rows[0].keys()), db_questions, keyed=True)
+
+        if wants_async():
+            job = submit_job("import", import_job, fields, lambda: plan.score(rows))
+            return jsonify({"job": job.job_info()}), 202
+
+        try:
+            dataset, features, labels = run_import(NoProgress(), fields, lambda: plan.score(rows))
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
 
-        strand_entries = []
-
-        for row in rows:
-            raw_strand = (
-                row.get("Strand")
-                or row.get("strand")
-                or row.get("Is your Senior High School strand aligned with your current course/program?")
-                or ""
-            ).strip()
-
-            # Map long-form strand names to short forms
-            strand_map = {
-                "science, technology, engineering and mathematics": "STEM",
-                "humanities and social sciences": "HUMSS",
-                "accountancy and business management": "ABM"
-            }
-
-            norm_strand = normalize(raw_strand)
-            for key, val in strand_map.items():
-                if key in norm_strand:
-                    strand_label = val
-                    break
-            else:
-                strand_label = raw_strand
-
-            totals = {"STEM": 0, "ABM": 0, "HUMSS": 0}
-
-            for question, value in row.items():
-                norm_q = normalize(question)
-                if norm_q == "strand" or norm_q not in db_questions:
-                    continue
-                strand = db_questions.get(norm_q)
-                if strand in totals:
-                    try:
-                        totals[strand] += int(value or 0)
-                    except (ValueError, TypeError):
-                        return jsonify({"error": f"Invalid score for question '{question}'"}), 400
-
-            entry = Data(
-                data_set_id=dataset.data_set_id,
-                strand=strand_label,
-                stem_score=totals["STEM"],
-                abm_score=totals["ABM"],
-                humss_score=totals["HUMSS"],
-            )
-            db.session.add(entry)
-            strand_entries.append(entry.data_info())
+        return jsonify({
+            "success": True,
+            "dataset": dataset.data_set_info(),
+            "rows_imported": len(labels),
+            "sample": import_sample(dataset.data_set_id, features, labels),
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        print("❌ Error during import:", str(e))
+        return jsonify({"error": str(e)}), 500
 
-        print(f"✅ Successfully processed {len(strand_entries)} rows with strand labels")
 
-        # --- Run KNN ---
-        from app.services.KNN import KNN
-        X = [[r["stem_score"], r["abm_score"], r["humss_score"]] for r in strand_entries]
-        y = [r["strand"] for r in strand_entries]
+# Check a file's header row against a question set before uploading the rows
+@dataset_bp.route("/import_dataset/validate", methods=["POST"])
+def validate_import_header():
+    try:
+        data = request.get_json()
+        question_set_id = data.get("question_set_id")
+        header = data.get("header")
 
-        if len(X) >= 2:
-            knn_runner = KNN(None, X, y)
-            best_k, accuracy, results, fold_data = knn_runner.calculate_k()
-            dataset.best_k = best_k
-            dataset.accuracy = float(accuracy)
-        else:
-            dataset.best_k = 5
-            dataset.accuracy = 1.0
+        if not question_set_id or not isinstance(header, list):
+            return jsonify({"error": "Missing question_set_id or header"}), 400
 
-        db.session.commit()
+        db_questions = question_index(question_set_id)
+        if not db_questions:
+            return jsonify({"error": "No questions found for this question set"}), 400
+
+        header = ["" if cell is None else str(cell) for cell in header]
+        missing_in_file, extra_in_file = check_header(header, db_questions)
+        return jsonify({
+            "valid": not missing_in_file,
+            "missing_questions": sorted(missing_in_file),
+            "extra_questions": sorted(extra_in_file),
+            "strand_column": strand_column(header),
+            "question_count": len(db_questions),
+        }), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+# Create a new dataset from an uploaded CSV/XLSX file, streamed in chunks
+@dataset_bp.route("/import_dataset/upload", methods=["POST"])
+def import_dataset_upload():
+    try:
+        dataset_name = request.form.get("dataset_name")
+        description = request.form.get("description")
+        question_set_id = request.form.get("question_set_id", type=int)
+        upload = request.files.get("file")
+
+        if not dataset_name or not question_set_id or upload is None:
+            return jsonify({"error": "Missing dataset_name, question_set_id, or file"}), 400
+
+        if DataSet.query.filter_by(data_set_name=dataset_name).first():
+            return jsonify({"error": DUPLICATE_NAME}), 409
+
+        db_questions = question_index(question_set_id)
+        if not db_questions:
+            return jsonify({"error": "No questions found for this question set"}), 400
+
+        fields = {
+            "data_set_name": dataset_name,
+            "data_set_description": description,
+            "question_set_id": question_set_id,
+        }
+        print(f"📥 Importing dataset from {upload.filename}: {dataset_name}")
+
+        # A queued import reads the file after this request is gone, so keep a copy on disk
+        if wants_async():
+            try:
+                path = save_upload(upload)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            try:
+                with open_saved_upload(path) as (header, rows):
+                    missing_in_file, extra_in_file = check_header(header, db_questions)
+            except ValueError as e:
+                os.remove(path)
+                return jsonify({"error": str(e)}), 400
+            if missing_in_file:
+                os.remove(path)
+                return jsonify({
+                    "error": "Import failed due to missing questions or Strand values.",
+                    "missing_questions": list(missing_in_file),
+                }), 400
+
+            job = submit_job("import", upload_job, fields, path, db_questions)
+            return jsonify({"job": job.job_info()}), 202
+
+        try:
+            header, rows = read_upload(upload)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        missing_in_file, extra_in_file = check_header(header, db_questions)
+        if missing_in_file:
+            return jsonify({
+                "error": "Import failed due to missing questions or Strand values.",
+                "missing_questions": list(missing_in_file),
+            }), 400
+        if extra_in_file:
+            print(f"⚠️ Ignoring {len(extra_in_file)} extra question(s) not in DB: {list(extra_in_file)[:5]}")
 
-        print(f"✅ Import complete — K={dataset.best_k}, Accuracy={dataset.accuracy:.2f}")
+        # --- validate/score one chunk at a time, then tune and insert ---
+        try:
+            dataset, features, labels = run_import(
+                NoProgress(), fields, lambda: score_upload(header, rows, db_questions)
+            )
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
 
         return jsonify({
             "success": True,
             "dataset": dataset.data_set_info(),
-            "rows": strand_entries
+            "rows_imported": len(labels),
+            "sample": import_sample(dataset.data_set_id, features, labels),
         }), 201
 
     except Exception as e:
@@ -197,17 +431,117 @@ def delete_dataset(data_set_id):
     try:
         dataset = DataSet.query.get_or_404(data_set_id)
         db.session.delete(dataset)
+        bump_version("datasets", "results")
         db.session.commit()
+        model_registry.invalidate(data_set_id)
+        drop_lookup_table(data_set_id)
+        drop_snapshot(data_set_id)
         return jsonify({"message": "Dataset deleted successfully"}), 200
     except SQLAlchemyError as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+@dataset_bp.route("/datasets/<int:data_set_id>/predict", methods=["POST"])
+def predict_strand(data_set_id):
+    try:
+        dataset = DataSet.query.get_or_404(data_set_id)
+        data = request.get_json()
+        sample = data.get("sample")
+
+        if not is_sample(sample):
+            return jsonify({"error": "sample must be [stem_score, abm_score, humss_score]"}), 400
+
+        # Without the neighbor list the answer can come from the precomputed table.
+        if data.get("neighbors") is False:
+            result = lookup(dataset, sample)
+            if result is not None:
+                return jsonify(result), 200
+
+        runner = model_registry.get(dataset)
+        return jsonify(runner.start_algorithm([sample])), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+@dataset_bp.route("/datasets/<int:data_set_id>/predict-batch", methods=["POST"])
+def predict_strand_batch(data_set_id):
+    try:
+        dataset = DataSet.query.get_or_404(data_set_id)
+        data = request.get_json()
+        samples = data.get("samples")
+
+        if not isinstance(samples, list) or not samples or not all(is_sample(sample) for sample in samples):
+            return jsonify({"error": "samples must be a list of [stem_score, abm_score, humss_score] rows"}), 400
+
+        runner = model_registry.get(dataset)
+        return jsonify({
+            "best_k": runner.best_k,
+            "accuracy": runner.accuracy,
+            "results": runner.predict_many(runner.model, samples),
+        }), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+@dataset_bp.route("/datasets/<int:data_set_id>/retune", methods=["POST"])
+def retune_dataset(data_set_id):
+    try:
+        dataset = DataSet.query.get_or_404(data_set_id)
+        X, y = load_training_data(data_set_id)
+
+        try:
+            check_folds(y)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if wants_async():
+            job = submit_job("retune", retune_job, data_set_id)
+            return jsonify({"job": job.job_info()}), 202
+
+        dataset = run_retune(NoProgress(), data_set_id)
+        return jsonify(dataset.data_set_info()), 200
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@dataset_bp.route("/datasets/<int:data_set_id>/evaluation", methods=["GET"])
+def get_dataset_evaluation(data_set_id):
+    try:
+        evaluation = DataSetEvaluation.query.filter_by(data_set_id=data_set_id).first()
+        if evaluation is None:
+            return jsonify({"error": "No evaluation stored for this dataset"}), 404
+        return jsonify(evaluation.evaluation_info()), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
 @dataset_bp.route("/datasets/<int:data_set_id>/records", methods=["GET"])
 def get_dataset_records(data_set_id):
+    """All rows as a list by default.
+
+    ``limit``/``after`` switch to keyset pages over data_id, ``format=ndjson``
+    or ``format=csv`` streams the rows, and ``fields`` picks the columns.
+    """
     try:
-        records = Data.query.filter_by(data_set_id=data_set_id).all()
-        return jsonify([r.data_info() for r in records]), 200
+        try:
+            names = record_fields(request.args.get("fields"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        fmt = request.args.get("format", "json")
+        after = request.args.get("after", type=int)
+        limit = request.args.get("limit", type=int)
+
+        if fmt in STREAM_TYPES:
+            return Response(
+                stream_with_context(stream_records(data_set_id, names, fmt, after)),
+                mimetype=STREAM_TYPES[fmt],
+            )
+        if fmt != "json":
+            return jsonify({"error": "format must be json, ndjson or csv"}), 400
+
+        if limit is None and after is None:
+            return jsonify(fetch_records(data_set_id, names)), 200
+
+        limit = max(1, min(limit or Config.RECORDS_PAGE_SIZE, Config.RECORDS_MAX_PAGE))
+        return jsonify(fetch_page(data_set_id, names, after, limit)), 200
     except SQLAlchemyError as e:
         return jsonify({"error": str(e)}), 500
     
@@ -222,18 +556,25 @@ def update_dataset_status(data_set_id):
         data = request.get_json()
         new_status = data.get("status")
 
+        changed_ids = [data_set_id]
         if new_status == "Active":
-            DataSet.query.filter(
+            previously_active = DataSet.query.filter(
                 DataSet.data_set_id != data_set_id,
                 DataSet.status == "Active"
-            ).update({"status": "Inactive"}, synchronize_session=False)
+            )
+            changed_ids += [ds.data_set_id for ds in previously_active.with_entities(DataSet.data_set_id)]
+            previously_active.update({"status": "Inactive"}, synchronize_session=False)
             dataset.status = "Active"
 
         elif new_status == "Inactive":
             dataset.status = "Inactive"
 
         print("Changed to ACtive")
+        bump_version("datasets")
         db.session.commit()
+        model_registry.invalidate(*changed_ids)
+        if dataset.status == "Active":
+            refresh_lookup_table(dataset)
         return jsonify(dataset.data_set_info()), 200
 
     except SQLAlchemyError as e:
@@ -263,7 +604,13 @@ def update_dataset_info(data_set_id):
         # ✅ Update fields
         dataset.data_set_name = new_name
         dataset.data_set_description = data.get("data_set_description", dataset.data_set_description)
+        # Dataset names appear in the results listing
+        bump_version("datasets", "results")
         db.session.commit()
+        model_registry.invalidate(data_set_id)
+        # The edit moved last_updated, which retires the dataset's lookup table
+        if dataset.status == "Active":
+            refresh_lookup_table(dataset)
 
         print("✅ Updated dataset:", dataset.data_set_info())
         return jsonify(dataset.data_set_info()), 200
@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import Job
+
+jobs_bp = Blueprint("jobs", __name__)
+
+# Status of a background import/retune job
+@jobs_bp.route("/jobs/<int:job_id>", methods=["GET"])
+def get_job(job_id):
+    try:
+        job = Job.query.get_or_404(job_id)
+        return jsonify(job.job_info()), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,12 +1,26 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from app.models import QuestionSet, Question
+from sqlalchemy import func, select
 from sqlalchemy.exc import SQLAlchemyError
+from app.services.question_index import drop_question_index
+from app.services.http_cache import conditional, bump_version
 
 question_sets_bp = Blueprint("question-sets", __name__)
 
+def question_sets_version():
+    return [
+        select(func.count(QuestionSet.question_set_id)),
+        select(func.max(QuestionSet.last_updated)),
+        select(func.count(Question.question_id)),
+    ]
+
+def question_set_version(set_id):
+    return [select(QuestionSet.last_updated).where(QuestionSet.question_set_id == set_id)]
+
 # Get all question sets
 @question_sets_bp.route("/question-sets", methods=["GET"])
+@conditional("question_sets", question_sets_version)
 def get_question_sets():
     sets = QuestionSet.query.all()
     response = []
@@ -25,6 +39,7 @@ def get_question_sets():
 
 # Get a specific question set (with all questions)
 @question_sets_bp.route("/question-sets/<int:set_id>", methods=["GET"])
+@conditional("question_sets", question_set_version)
 def get_question_set(set_id):
     s = QuestionSet.query.get_or_404(set_id)
     return jsonify({
@@ -68,6 +83,7 @@ def create_question_set():
             )
             db.session.add(new_question)
 
+        bump_version("question_sets")
         db.session.commit()
 
         return jsonify(new_set.question_set_info()), 201
@@ -98,6 +114,7 @@ def update_question_set(set_id):
         # ✅ Update fields
         s.question_set_name = new_name
         s.description = data.get("description", s.description)
+        bump_version("question_sets")
         db.session.commit()
         return jsonify(s.question_set_info()), 200
 
@@ -122,7 +139,9 @@ def delete_question_set(set_id):
     print(s)
     try:
         db.session.delete(s)
+        bump_version("question_sets", "datasets")
         db.session.commit()
+        drop_question_index(set_id)
         return jsonify({"message": f"Question set {set_id} deleted"}), 200
     except SQLAlchemyError as e:
         db.session.rollback()
@@ -138,8 +157,12 @@ def update_question(question_id):
         # Update allowed fields
         question.question_text = data.get("question_text", question.question_text)
         question.strand = data.get("strand", question.strand)
+        # Bump the set so cached question indexes in every worker go stale
+        question.set.last_updated = db.func.now()
+        bump_version("question_sets")
 
         db.session.commit()
+        drop_question_index(question.set_id)
         print(f"✅ Updated question ID {question_id}: {question.question_text}")
 
         return jsonify({
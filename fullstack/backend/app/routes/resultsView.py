@@ -1,58 +1,230 @@
 # app/routes/results.py
-from flask import Blueprint, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import SQLAlchemyError
 from app import db
+from app.config import Config
 from app.models import Results, Assessment, User, DataSet, Neighbors, TieTable
+from app.services.results_summary import results_summary
+from app.services.recommendations import recommend_assessments
+from app.services.neighbor_packing import unpack_neighbors
+from app.services.http_cache import conditional, bump_version
+from app.services.results_export import export_query, stream_export, require_pyarrow, EXPORT_TYPES
 
 results_bp = Blueprint("results", __name__, url_prefix="/results")
 
+def parse_date_arg(name, end_of_day=False):
+    """Datetime from an ISO date/datetime query arg; a bare date used as an upper bound covers that whole day."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def filter_results(query):
+    """Apply the data_set_id, strand, tie and date_from/date_to query args to a results query."""
+    data_set_id = request.args.get("data_set_id", type=int)
+    if data_set_id is not None:
+        query = query.filter(Assessment.data_set_id == data_set_id)
+    strand = request.args.get("strand")
+    if strand:
+        query = query.filter(Results.recommended_strand == strand)
+    tie = request.args.get("tie")
+    if tie is not None:
+        query = query.filter(Results.tie.is_(tie.lower() == "true"))
+    try:
+        date_from = parse_date_arg("date_from")
+        date_to = parse_date_arg("date_to", end_of_day=True)
+    except ValueError:
+        raise ValueError("date_from/date_to must be ISO dates (YYYY-MM-DD)")
+    if date_from is not None:
+        query = query.filter(Results.created_at >= date_from)
+    if date_to is not None:
+        query = query.filter(Results.created_at < date_to)
+    return query
+
+def load_unpacked_neighbors(results, chunk_size=500):
+    """Load Results.neighbors for the results without neighbors_packed, in IN queries of chunk_size ids.
+
+    Packed results never read the relationship, so they are left out of the
+    query instead of fetching nothing for each of them.
+    """
+    unpacked = {r.results_id: [] for r in results if r.neighbors_packed is None}
+    ids = list(unpacked)
+    for start in range(0, len(ids), chunk_size):
+        rows = (
+            Neighbors.query
+            .filter(Neighbors.results_id.in_(ids[start:start + chunk_size]))
+            .order_by(Neighbors.results_id, Neighbors.neighbor_index)
+        )
+        for n in rows:
+            unpacked[n.results_id].append(n)
+    for r in results:
+        if r.results_id in unpacked:
+            set_committed_value(r, "neighbors", unpacked[r.results_id])
+
+def result_payload(r, assessment, user, dataset):
+    return {
+        **r.result_info(),
+
+        "user_data": {
+            "name": f"{user.first_name} {user.last_name}" if user else None,
+            "email": user.email if user else None,
+        },
+
+        "dataset": {
+            "data_set_id": dataset.data_set_id if dataset else None,
+            "data_set_name": dataset.data_set_name if dataset else None,
+            "created_at": dataset.created_at.isoformat() if dataset else None
+        },
+
+        # ✅ Include both result scores and assessment totals
+        "assessment_info": {
+            "stem_score": float(r.stem_score),
+            "humss_score": float(r.humss_score),
+            "abm_score": float(r.abm_score),
+            "stem_total": float(assessment.stem_total) if assessment else 0,
+            "humss_total": float(assessment.humss_total) if assessment else 0,
+            "abm_total": float(assessment.abm_total) if assessment else 0,
+            "created_at": assessment.created_at.isoformat() if assessment else None,
+        },
+
+        "neighbors": unpack_neighbors(r.neighbors_packed) if r.neighbors_packed is not None else [
+            {
+                "neighbor_index": n.neighbor_index,
+                "strand": n.strand,
+                "distance": float(n.distance) if n.distance else 0
+            } for n in r.neighbors
+        ],
+
+        "tie_info": {
+            "stem_weight": r.tie_table.stem_weight,
+            "humss_weight": r.tie_table.humss_weight,
+            "abm_weight": r.tie_table.abm_weight
+        } if r.tie_table else None
+    }
+
+def results_version():
+    return [
+        select(func.count(Results.results_id)),
+        select(func.max(Results.results_id)),
+        select(func.max(DataSet.last_updated)),
+    ]
+
 @results_bp.route("/", methods=["GET"])
+@conditional("results", results_version)
 def get_all_results():
-    results = Results.query.all()
-    response = []
+    """All results as a list by default.
 
-    for r in results:
-        assessment = Assessment.query.get(r.assessment_id)
-        user = User.query.get(assessment.user_id) if assessment else None
-        dataset = DataSet.query.get(assessment.data_set_id) if assessment else None
-
-        response.append({
-            **r.result_info(),
-
-            "user_data": {
-                "name": f"{user.first_name} {user.last_name}" if user else None,
-                "email": user.email if user else None,
-            },
-
-            "dataset": {
-                "data_set_id": dataset.data_set_id if dataset else None,
-                "data_set_name": dataset.data_set_name if dataset else None,
-                "created_at": dataset.created_at.isoformat() if dataset else None
-            },
-
-            # ✅ Include both result scores and assessment totals
-            "assessment_info": {
-                "stem_score": float(r.stem_score),
-                "humss_score": float(r.humss_score),
-                "abm_score": float(r.abm_score),
-                "stem_total": float(assessment.stem_total) if assessment else 0,
-                "humss_total": float(assessment.humss_total) if assessment else 0,
-                "abm_total": float(assessment.abm_total) if assessment else 0,
-                "created_at": assessment.created_at.isoformat() if assessment else None,
-            },
-
-            "neighbors": [
-                {
-                    "neighbor_index": n.neighbor_index,
-                    "strand": n.strand,
-                    "distance": float(n.distance) if n.distance else 0
-                } for n in r.neighbors
-            ],
-
-            "tie_info": {
-                "stem_weight": r.tie_table.stem_weight,
-                "humss_weight": r.tie_table.humss_weight,
-                "abm_weight": r.tie_table.abm_weight
-            } if r.tie_table else None
-        })
-
-    return jsonify(response), 200
+    Filters: data_set_id, strand (recommended strand), date_from/date_to
+    (created_at, ISO dates) and tie=true|false. ``limit``/``after`` switch
+    to keyset pages over results_id. Results, their neighbors and tie rows
+    are loaded in three queries however many there are.
+    """
+    try:
+        # Assessment, user and dataset come in with the result rows; tie rows,
+        # and neighbors of results stored before packing, in one IN query each.
+        query = (
+            db.session.query(Results, Assessment, User, DataSet)
+            .outerjoin(Assessment, Assessment.assessment_id == Results.assessment_id)
+            .outerjoin(User, User.user_id == Assessment.user_id)
+            .outerjoin(DataSet, DataSet.data_set_id == Assessment.data_set_id)
+            .options(selectinload(Results.tie_table))
+            .order_by(Results.results_id)
+        )
+
+        try:
+            query = filter_results(query)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        after = request.args.get("after", type=int)
+        limit = request.args.get("limit", type=int)
+        if limit is None and after is None:
+            rows = query.all()
+            load_unpacked_neighbors([row[0] for row in rows])
+            return jsonify([result_payload(*row) for row in rows]), 200
+
+        limit = max(1, min(limit or Config.RESULTS_PAGE_SIZE, Config.RESULTS_MAX_PAGE))
+        if after is not None:
+            query = query.filter(Results.results_id > after)
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        load_unpacked_neighbors([row[0] for row in rows])
+        return jsonify({
+            "results": [result_payload(*row) for row in rows],
+            "limit": limit,
+            "next_after": rows[-1][0].results_id if has_more else None,
+        }), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+@results_bp.route("/export", methods=["GET"])
+def export_results():
+    """Every result with its assessment totals, neighbors and tie weights as a streamed file.
+
+    ``format=csv`` (default) or ``format=parquet`` (needs pyarrow); takes the
+    same filters as the listing. Rows are read through a server-side cursor
+    and written batch by batch, so memory does not grow with the table.
+    """
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_TYPES:
+        return jsonify({"error": "format must be csv or parquet"}), 400
+    if fmt == "parquet":
+        try:
+            require_pyarrow()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 501
+    try:
+        query = filter_results(export_query())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mimetype, filename = EXPORT_TYPES[fmt]
+    return Response(
+        stream_with_context(stream_export(query, fmt)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+# Outcome counts and averages from the summary table that /cron keeps current
+@results_bp.route("/summary", methods=["GET"])
+def get_results_summary():
+    try:
+        return jsonify(results_summary()), 200
+    except SQLAlchemyError as e:
+        return jsonify({"error": str(e)}), 500
+
+# Score assessments and store their recommendations, one {"assessment_id"}
+# or a batch {"assessment_ids": [...]} for re-scoring
+@results_bp.route("/", methods=["POST"])
+def create_results():
+    try:
+        data = request.get_json()
+        assessment_ids = data.get("assessment_ids") or [data.get("assessment_id")]
+        if not all(isinstance(i, int) for i in assessment_ids):
+            return jsonify({"error": "Provide assessment_id or a list of assessment_ids"}), 400
+
+        assessments = Assessment.query.filter(Assessment.assessment_id.in_(assessment_ids)).all()
+        missing = set(assessment_ids) - {a.assessment_id for a in assessments}
+        if missing:
+            return jsonify({"error": "Assessment not found", "missing_assessment_ids": sorted(missing)}), 404
+
+        saved = recommend_assessments(assessments)
+        bump_version("results")
+        db.session.commit()
+        return jsonify({
+            "results": [
+                {"results_id": results_id, "assessment_id": assessment.assessment_id, **prediction}
+                for assessment, results_id, prediction in saved
+            ]
+        }), 201
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
@@ -3,6 +3,7 @@ from ..models import User
 from app import db
 from ..services.hashing import hash_password
 from sqlalchemy.exc import IntegrityError
+from ..services.http_cache import bump_version
 
 userManagement_bp = Blueprint("user-management", __name__)
 
@@ -41,6 +42,7 @@ def delete(chosen_id):
     try:
         user = User.query.get(chosen_id)    
         db.session.delete(user)
+        bump_version("results")
         db.session.commit()
         return jsonify({"message": "User deleted successfully"}), 200
     except Exception as e:
@@ -70,7 +72,9 @@ def update(chosen_id):
         user.affix = data.get("affix", user.affix)
         user.password = data.get("password", user.password)
         user.role = data.get("role", user.role)
-        
+        # Names and emails appear in the results listing
+        bump_version("results")
+
         db.session.commit()
         return jsonify({"message": "User updated successfully"}), 200
     except Exception as e:
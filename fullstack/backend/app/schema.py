@@ -0,0 +1,35 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import Results
+
+# Columns mapped on tables that existed before them. db.create_all() only
+# creates missing tables, so these are added to older databases at startup.
+ADDED_COLUMNS = [
+    Results.__table__.c.neighbors_packed,
+]
+
+
+def column_names(table_name):
+    return {column["name"] for column in inspect(db.engine).get_columns(table_name)}
+
+
+def add_missing_columns():
+    """ALTER TABLE ... ADD COLUMN for each of ADDED_COLUMNS the database lacks; returns the ones added."""
+    added = []
+    for column in ADDED_COLUMNS:
+        table_name = column.table.name
+        if column.name in column_names(table_name):
+            continue
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"))
+        except SQLAlchemyError:
+            # Another worker starting at the same time may have added it first
+            if column.name not in column_names(table_name):
+                raise
+            continue
+        added.append(f"{table_name}.{column.name}")
+    return added
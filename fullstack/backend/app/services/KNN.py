@@ -1,124 +1,392 @@
+import time
+
 import numpy as np
-from sklearn.model_selection import GridSearchCV, StratifiedKFold, cross_val_predict
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 from tabulate import tabulate
+from app.config import Config
+from app.services.tuning import sweep_k
+
+# Column order used for votes and tie weights; matches the key order predict()
+# and tie_breaker() walk, so argmax picks the same strand their max() does.
+STRANDS = ["STEM", "HUMSS", "ABM"]
+VOTE_KEYS = ["stem_score", "humss_score", "abm_score"]
+WEIGHT_KEYS = ["stem_weight", "humss_weight", "abm_weight"]
+
+
+class GridNeighbors:
+    """Exact k-nearest-neighbor search for a handful of features, without sklearn's per-call overhead.
+
+    Training rows are bucketed into a uniform grid (about CELL_ROWS rows per
+    cell) and stored as one contiguous float32 matrix sorted by cell, so every
+    cell is a slice. A query grows a box of cells around itself until it holds
+    k rows, which bounds the k-th distance, then scans exactly the cells that
+    bound can reach. Equidistant neighbors are ordered by training row index.
+    Strand totals are integers, so float32 storage gives the same distances as
+    sklearn. Meant for single queries; large batches are better served by sklearn.
+    """
+
+    CELL_ROWS = 8
+
+    def __init__(self, n_neighbors=5):
+        self.n_neighbors = n_neighbors
+
+    def fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        self._lower = X.min(axis=0).astype(np.float64)
+        extent = np.maximum(X.max(axis=0) - self._lower, 1.0)
+        self._cell = float((np.prod(extent) * self.CELL_ROWS / n) ** (1.0 / n_features))
+        self._shape = tuple((extent // self._cell).astype(int) + 1)
+        self._last = np.array(self._shape) - 1
+        self._strides = np.cumprod((self._shape[1:] + (1,))[::-1])[::-1]
+
+        cell_ids = self._cells_of(X) @ self._strides
+        self._order = np.argsort(cell_ids, kind="stable")
+        self._X = np.ascontiguousarray(X[self._order])
+        self._offsets = np.searchsorted(cell_ids[self._order], np.arange(np.prod(self._shape) + 1))
+        self.n_samples_fit_ = n
+        return self
+
+    def _cells_of(self, points):
+        cells = np.floor((points - self._lower) / self._cell).astype(np.intp)
+        return np.clip(cells, 0, self._last)
+
+    def _rows_in_box(self, low, high):
+        ids = np.zeros(1, dtype=np.intp)
+        for lo, hi, stride in zip(low, high, self._strides):
+            ids = np.add.outer(ids, np.arange(lo, hi + 1) * stride).ravel()
+        starts, lengths = self._offsets[ids], self._offsets[ids + 1] - self._offsets[ids]
+        total = int(lengths.sum())
+        # Concatenate the cell slices without a Python loop over cells.
+        shift = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return shift + np.arange(total)
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        k = min(n_neighbors or self.n_neighbors, self.n_samples_fit_)
+        distances = np.empty((len(X), k))
+        indices = np.empty((len(X), k), dtype=np.intp)
+        for row, query in enumerate(X):
+            distances[row], indices[row] = self._query(query, k)
+        return (distances, indices) if return_distance else indices
+
+    def _query(self, query, k):
+        center = self._cells_of(query)
+        radius = 1
+        while True:
+            rows = self._rows_in_box(np.maximum(center - radius, 0), np.minimum(center + radius, self._last))
+            if len(rows) >= k:
+                break
+            radius *= 2
+
+        # Every true neighbor is within the k-th distance found so far.
+        diff = self._X[rows] - query
+        bound = np.sqrt(np.partition(np.einsum("ij,ij->i", diff, diff), k - 1)[k - 1])
+        rows = self._rows_in_box(self._cells_of(query - bound), self._cells_of(query + bound))
+
+        diff = self._X[rows] - query
+        squared = np.einsum("ij,ij->i", diff, diff)
+        rows = self._order[rows]
+        if len(squared) > k:
+            keep = squared <= np.partition(squared, k - 1)[k - 1]
+            squared, rows = squared[keep], rows[keep]
+        nearest = np.lexsort((rows, squared))[:k]
+        return np.sqrt(squared[nearest]), rows[nearest]
+
+
+# Neighbor backends for single-query predict(), selected per deployment with
+# KNN_ENGINE. Each takes n_neighbors and offers fit(X, y) and kneighbors(X).
+# Batches (predict_many, vote_arrays) always use sklearn. Engines may pick
+# different rows when the k-th and (k+1)-th neighbors are equidistant, so
+# those queries are answered by sklearn (see engine_neighbors) and every
+# engine gives the same votes and recommendations.
+ENGINES = {
+    "sklearn": KNeighborsClassifier,
+    "grid": GridNeighbors,
+}
 
 
 class KNN:
-    def __init__(self, sample_answers, dataset_list, strand_list):
+    def __init__(self, sample_answers, dataset_list, strand_list, counts=None, row_order=None, verbose=None):
         self.sample_answers = sample_answers
         self.dataset_list = dataset_list
         self.strand_list = strand_list
-
-    def start_algorithm(self):
-        k, acc = self.calculate_k()   
-        knn = KNeighborsClassifier(n_neighbors=k)
-        knn.fit(self.dataset_list, self.strand_list)
-        results = self.predict(knn)
-        results["best_k"] = k          
-        results["accuracy"] = acc      
+        # Set by collapsed(): multiplicity of each unique row, and the original
+        # row positions grouped by unique row (for reporting neighbor_index).
+        self.counts = counts
+        self.row_order = row_order
+        # Console output of tuning tables and per-prediction traces
+        self.verbose = Config.KNN_VERBOSE if verbose is None else verbose
+        self.report = None
+        self.model = None
+        self.single_engine = None
+        self.k = None
+        self.best_k = None
+        self.accuracy = None
+        self._strand_codes = None
+
+    @classmethod
+    def collapsed(cls, sample_answers, dataset_list, strand_list, verbose=None):
+        """Approximate runner over the unique (features, strand) rows, weighted by how often each occurs.
+
+        Searches only the distinct answer profiles. Votes, tie weights and
+        recommendations match the expanded dataset when the k-th neighbor's
+        distance is not shared. When several rows tie at that distance, the
+        expanded search fills the last places in row order, while this one
+        fills them one unique profile at a time. The votes, and so the
+        recommendation, can then differ, which is why serving only uses it
+        when KNN_APPROX_COLLAPSE_DUPLICATES is set.
+        """
+        labels, label_codes = np.unique(np.asarray(strand_list), return_inverse=True)
+        rows = np.column_stack([np.asarray(dataset_list), label_codes])
+        unique_rows, inverse, counts = np.unique(rows, axis=0, return_inverse=True, return_counts=True)
+        row_order = np.argsort(inverse.ravel(), kind="stable")
+        return cls(
+            sample_answers,
+            unique_rows[:, :-1].tolist(),
+            labels[unique_rows[:, -1].astype(int)].tolist(),
+            counts=counts,
+            row_order=row_order,
+            verbose=verbose,
+        )
+
+    def training_size(self):
+        return len(self.dataset_list) if self.counts is None else int(self.counts.sum())
+
+    def start_algorithm(self, sample_answers=None, best_k=None, accuracy=None):
+        # A runner kept in the model registry is already fitted, so only the
+        # neighbor query is paid per recommendation. Passing the best_k and
+        # accuracy stored on the DataSet skips tuning altogether.
+        if self.model is None:
+            if best_k:
+                self.fit(best_k, accuracy)
+            else:
+                k, acc, _, _ = self.calculate_k()
+                self.fit(k, acc)
+        results = self.predict(self.model, sample_answers)
+        results["best_k"] = self.best_k
+        results["accuracy"] = self.accuracy
         return results
 
-    def calculate_k(self):
+    def fit(self, k, accuracy, engine=None):
+        # k copies of the same profile are k neighbors, so a collapsed runner
+        # never needs more than k unique rows to fill its neighbor list.
+        n_neighbors = min(k, len(self.dataset_list))
+        knn = KNeighborsClassifier(n_neighbors=n_neighbors)
+        knn.fit(self.dataset_list, self.strand_list)
+        self.model = knn
+        engine = engine or Config.KNN_ENGINE
+        if engine == "sklearn":
+            self.single_engine = knn
+        else:
+            self.single_engine = ENGINES[engine](n_neighbors=n_neighbors).fit(self.dataset_list, self.strand_list)
+        self.k = min(k, self.training_size())
+        self.best_k = k
+        self.accuracy = accuracy
+        return knn
+
+    def strand_codes(self):
+        # Index into STRANDS per training row; anything else gets len(STRANDS)
+        # so it takes part in the neighbor list but never in the vote.
+        if self._strand_codes is None:
+            codes = {strand: i for i, strand in enumerate(STRANDS)}
+            self._strand_codes = np.array([codes.get(s, len(STRANDS)) for s in self.strand_list], dtype=np.int8)
+        return self._strand_codes
+
+    def calculate_k(self, k_values=None):
+        started = time.perf_counter()
         X = np.array(self.dataset_list)
         y = np.array(self.strand_list)
-
-        # ---- Step 1: GridSearchCV to find best K ----
-        model = KNeighborsClassifier()
-        param_grid = {'n_neighbors': list(range(5, 11))}
-        skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-        grid_search = GridSearchCV(model, param_grid, cv=skf, return_train_score=True)
-        grid_search.fit(X, y)
+        if self.counts is not None:
+            # Folds have to split respondents, not answer profiles; putting the
+            # rows back in import order keeps the folds of the expanded dataset.
+            X_rows, y_rows = np.empty((self.training_size(), X.shape[1]), X.dtype), np.empty(self.training_size(), y.dtype)
+            X_rows[self.row_order] = np.repeat(X, self.counts, axis=0)
+            y_rows[self.row_order] = np.repeat(y, self.counts)
+            X, y = X_rows, y_rows
+
+        # ---- Step 1: One neighbor query per fold scores every candidate K ----
+        if k_values is None:
+            k_values = range(Config.KNN_K_MIN, Config.KNN_K_MAX + 1)
+        sweep = sweep_k(X, y, list(k_values), n_jobs=Config.TUNING_N_JOBS, backend=Config.TUNING_BACKEND)
+        n_splits = sweep["n_splits"]
 
         # ---- Step 2: Best parameters and results ----
-        k = grid_search.best_params_['n_neighbors']
-        acc = grid_search.best_score_
-        print(f"\nBest K: {k}, Best Mean Accuracy: {acc:.4f}")
-
-        # Keep cv_results_ for compatibility
-        results = grid_search.cv_results_
+        k = sweep["best_k"]
+        acc = sweep["best_score"]
+
+        # Same keys as GridSearchCV.cv_results_ for compatibility
+        results = {
+            "param_n_neighbors": np.array(sweep["k_values"]),
+            "params": [{"n_neighbors": k_val} for k_val in sweep["k_values"]],
+            "mean_test_score": sweep["mean_test_score"],
+            "std_test_score": sweep["std_test_score"],
+        }
+        for j in range(n_splits):
+            results[f"split{j}_test_score"] = sweep["split_test_scores"][:, j]
+
+        # ---- Step 3: Aggregated metrics for best K, from the same sweep ----
+        metrics_started = time.perf_counter()
+        all_y_test = sweep["y_true"]
+        all_y_pred = sweep["y_pred"]
+        metrics = {
+            "accuracy": accuracy_score(all_y_test, all_y_pred),
+            "precision_macro": precision_score(all_y_test, all_y_pred, average='macro', zero_division=0),
+            "recall_macro": recall_score(all_y_test, all_y_pred, average='macro', zero_division=0),
+            "f1_macro": f1_score(all_y_test, all_y_pred, average='macro', zero_division=0),
+        }
+        timings = dict(sweep["timings"])
+        timings["metrics"] = time.perf_counter() - metrics_started
+        timings["total"] = time.perf_counter() - started
+
+        # ---- Step 4: JSON-ready report of the whole run ----
+        report = {
+            "best_k": int(k),
+            "accuracy": float(acc),
+            "n_samples": int(len(y)),
+            "n_splits": n_splits,
+            "classes": [str(c) for c in sweep["classes"]],
+            "per_k": [
+                {
+                    "k": int(k_val),
+                    "mean": float(sweep["mean_test_score"][i]),
+                    "std": float(sweep["std_test_score"][i]),
+                    "fold_scores": [float(score) for score in sweep["split_test_scores"][i]],
+                } for i, k_val in enumerate(sweep["k_values"])
+            ],
+            "confusion_matrices": {
+                "folds": [cm.tolist() for cm in sweep["fold_confusion_matrices"]],
+                "aggregated": sweep["confusion_matrix"].tolist(),
+            },
+            "metrics": {name: float(value) for name, value in metrics.items()},
+            "timings": {phase: round(seconds, 6) for phase, seconds in timings.items()},
+        }
+        self.report = report
+        if self.verbose:
+            self.print_report(report)
+
+        return k, acc, results, report
+
+    def print_report(self, report):
+        print(f"\nBest K: {report['best_k']}, Best Mean Accuracy: {report['accuracy']:.4f}")
 
         # ---- Accuracy summary (mean ± std) ----
-        summary_table = [[k_val, f"{mean:.4f} ± {std:.4f}"]
-                        for mean, std, k_val in zip(results['mean_test_score'], results['std_test_score'], results['param_n_neighbors'])]
+        summary_table = [[row["k"], f"{row['mean']:.4f} ± {row['std']:.4f}"] for row in report["per_k"]]
         print("\nAccuracy per k (mean ± std):")
         print(tabulate(summary_table, headers=["k", "Mean ± Std"], tablefmt="grid"))
 
         # ---- Fold-level accuracies per k ----
-        fold_scores_table = []
-        for i, k_val in enumerate(results['param_n_neighbors']):
-            fold_scores = [results[f"split{j}_test_score"][i] for j in range(skf.get_n_splits())]
-            fold_scores_table.append([k_val] + [f"{s:.4f}" for s in fold_scores] + [f"{np.mean(fold_scores):.4f}"])
-
-        fold_headers = ["k"] + [f"Fold {j+1}" for j in range(skf.get_n_splits())] + ["Average"]
+        fold_scores_table = [
+            [row["k"]] + [f"{s:.4f}" for s in row["fold_scores"]] + [f"{np.mean(row['fold_scores']):.4f}"]
+            for row in report["per_k"]
+        ]
+        fold_headers = ["k"] + [f"Fold {j+1}" for j in range(report["n_splits"])] + ["Average"]
         print("\nAccuracy of each fold for each k:")
         print(tabulate(fold_scores_table, headers=fold_headers, tablefmt="grid"))
 
-        # ---- Step 3: Confusion matrices and metrics for best K ----
-        best_model = KNeighborsClassifier(n_neighbors=k)
-        all_conf = []
-        all_y_test = []
-        all_y_pred = []
-
+        # ---- Confusion matrices for best K ----
+        best = next(row for row in report["per_k"] if row["k"] == report["best_k"])
         print("\nConfusion Matrices per Fold (Best K):")
-        for fold_idx, (train_idx, test_idx) in enumerate(skf.split(X, y), 1):
-            X_train, X_test = X[train_idx], X[test_idx]
-            y_train, y_test = y[train_idx], y[test_idx]
-
-            best_model.fit(X_train, y_train)
-            y_pred = best_model.predict(X_test)
-
-            # Save for aggregated metrics
-            all_y_test.extend(y_test)
-            all_y_pred.extend(y_pred)
-
-            cm = confusion_matrix(y_test, y_pred, labels=np.unique(y))
-            all_conf.append(cm)
-            fold_acc = accuracy_score(y_test, y_pred)
-
-            print(f"\nFold {fold_idx} Confusion Matrix (Accuracy: {fold_acc:.4f}):")
-            print(cm)
-
-        # ---- Step 4: Aggregated confusion matrix and metrics ----
-        final_cm = sum(all_conf)
-        accuracy_final = accuracy_score(all_y_test, all_y_pred)
-        precision_macro = precision_score(all_y_test, all_y_pred, average='macro', zero_division=0)
-        recall_macro = recall_score(all_y_test, all_y_pred, average='macro', zero_division=0)
-        f1_macro = f1_score(all_y_test, all_y_pred, average='macro', zero_division=0)
+        for fold_idx, cm in enumerate(report["confusion_matrices"]["folds"], 1):
+            print(f"\nFold {fold_idx} Confusion Matrix (Accuracy: {best['fold_scores'][fold_idx - 1]:.4f}):")
+            print(np.array(cm))
 
+        metrics = report["metrics"]
         print("\nFinal (Aggregated) Confusion Matrix:")
-        print(final_cm)
+        print(np.array(report["confusion_matrices"]["aggregated"]))
         print("\nFinal Metrics (Aggregated from CV):")
-        print(f"Accuracy : {accuracy_final:.4f}")
-        print(f"Precision: {precision_macro:.4f}")
-        print(f"Recall   : {recall_macro:.4f}")
-        print(f"F1 Score : {f1_macro:.4f}")
-
-        return k, acc, results, []
-
-
-
-    def calculate_distance(self, knn):
-        distances, indices = knn.kneighbors(self.sample_answers)
-        print(distances)
-        print(indices)
+        print(f"Accuracy : {metrics['accuracy']:.4f}")
+        print(f"Precision: {metrics['precision_macro']:.4f}")
+        print(f"Recall   : {metrics['recall_macro']:.4f}")
+        print(f"F1 Score : {metrics['f1_macro']:.4f}")
+        print(f"Timings  : {report['timings']}")
+
+    def calculate_distance(self, knn, sample_answers=None):
+        if sample_answers is None:
+            sample_answers = self.sample_answers
+        # Single queries go to the KNN_ENGINE backend fitted alongside the model
+        if knn is self.model:
+            distances, indices = self.engine_neighbors(sample_answers)
+        else:
+            distances, indices = knn.kneighbors(sample_answers)
+        distances, indices = self.expand_neighbors(distances, indices)
+        self.log(distances)
+        self.log(indices)
         return indices[0], distances[0]
+
+    def engine_neighbors(self, sample_answers):
+        """kneighbors() of the KNN_ENGINE backend, with sklearn's answer wherever the two could differ.
+
+        Asks the engine for one neighbor more than the model. When the row
+        that fills the k-th place and the next one are equidistant, which of
+        them makes the cut is up to the engine, so that query is re-run on the
+        sklearn model.
+        """
+        n_neighbors = self.model.n_neighbors
+        if self.single_engine is self.model or n_neighbors >= self.model.n_samples_fit_:
+            return self.single_engine.kneighbors(sample_answers)
+
+        distances, indices = self.single_engine.kneighbors(sample_answers, n_neighbors=n_neighbors + 1)
+        last = np.full(len(indices), n_neighbors - 1)
+        if self.counts is not None:
+            # A unique row repeated several times can fill the k-th place early
+            last = (np.cumsum(self.counts[indices], axis=1) >= self.k).argmax(axis=1)
+        rows = np.arange(len(indices))
+        tied = distances[rows, last] == distances[rows, last + 1]
+        distances, indices = distances[:, :n_neighbors], indices[:, :n_neighbors]
+        if tied.any():
+            distances[tied], indices[tied] = self.model.kneighbors(np.asarray(sample_answers)[tied])
+        return distances, indices
+
+    def expand_neighbors(self, distances, indices):
+        """Repeat each unique neighbor by its count until k neighbors are filled.
+
+        A no-op for runners that were not collapsed. Afterwards the arrays look
+        exactly like a kneighbors() result on the expanded dataset, with every
+        index pointing at a unique row.
+        """
+        if self.counts is None:
+            return distances, indices
+        counts = self.counts[indices]
+        taken_before = np.cumsum(counts, axis=1) - counts
+        take = np.clip(self.k - taken_before, 0, counts).ravel()
+        n = len(indices)
+        return (
+            np.repeat(distances.ravel(), take).reshape(n, self.k),
+            np.repeat(indices.ravel(), take).reshape(n, self.k),
+        )
+
+    def training_rows(self, indices):
+        """Original 0-based row positions for (expanded) neighbor indices."""
+        if self.counts is None:
+            return indices
+        flat = indices.ravel()
+        # Copies of one unique row sit next to each other; number them 0, 1, ...
+        # and take that many steps into the row's group of original positions.
+        position = np.arange(len(flat))
+        run_start = np.ones(len(flat), dtype=bool)
+        run_start[1:] = flat[1:] != flat[:-1]
+        run_start[::indices.shape[1]] = True
+        copy = position - np.maximum.accumulate(np.where(run_start, position, 0))
+        group_start = np.cumsum(self.counts) - self.counts
+        return self.row_order[group_start[flat] + copy].reshape(indices.shape)
          
     
-    def predict(self, knn):
-        indices, distances = self.calculate_distance(knn)
+    def predict(self, knn, sample_answers=None):
+        indices, distances = self.calculate_distance(knn, sample_answers)
+        rows = self.training_rows(indices[None, :])[0]
         nearest_neighbors = []
         k = len(indices)
         for i in range(k):            
             nearest_neighbors.append(self.strand_list[indices[i]])
-        print(f"Nearest Neighbors: {nearest_neighbors}")
+        self.log(f"Nearest Neighbors: {nearest_neighbors}")
         total_stem = nearest_neighbors.count("STEM")
         total_humss = nearest_neighbors.count("HUMSS")
         total_abm = nearest_neighbors.count("ABM")
         strand_votes = {"stem_score": total_stem, "humss_score": total_humss, "abm_score": total_abm}
         vote_score = [total_stem, total_humss, total_abm]
-        print(f"Votes: {strand_votes}")
+        self.log(f"Votes: {strand_votes}")
         if vote_score.count(max(vote_score)) > 1:
             strand_votes["tie"] = True
             strand_votes["tie_strands"] = {}
@@ -130,16 +398,16 @@ class KNN:
             strand_votes["tie_strands"] = None
             recommendation = max(["stem_score", "humss_score", "abm_score"], key=strand_votes.get)
             
-            print(f"Recommendation: {recommendation}")
+            self.log(f"Recommendation: {recommendation}")
 
         fixed_recommendation = self.fix_recommendation(recommendation)
-        print(f"Recommendation: {fixed_recommendation}")
+        self.log(f"Recommendation: {fixed_recommendation}")
         strand_votes["recommendation"] = fixed_recommendation  
         strand_votes["neighbors"] = []
         strand_votes["k"] = k
         for i in range(k):
             strand_votes["neighbors"].append({})
-            strand_votes["neighbors"][i]["neighbor_index"] = int(indices[i] + 1)
+            strand_votes["neighbors"][i]["neighbor_index"] = int(rows[i] + 1)
             strand_votes["neighbors"][i]["strand"] = nearest_neighbors[i]
             strand_votes["neighbors"][i]["distance"] = float(distances[i])
         
@@ -147,6 +415,63 @@ class KNN:
         return strand_votes
 
 
+    def vote_arrays(self, knn, samples):
+        """Neighbor lookup, votes and tie-break for a (n, 3) matrix of [stem, abm, humss] rows.
+
+        Returns the raw arrays predict_many() and the lookup table are built
+        from: neighbor indices and distances (n, k), votes, tied mask and tie
+        weights (n, 3) in STRANDS order, the tie flag and the winning column.
+        """
+        distances, indices = self.expand_neighbors(*knn.kneighbors(np.asarray(samples, dtype=float)))
+        codes = self.strand_codes()[indices]
+        one_hot = codes[:, :, None] == np.arange(len(STRANDS))
+
+        votes = one_hot.sum(axis=1)
+        tied = votes == votes.max(axis=1, keepdims=True)
+        tie = tied.sum(axis=1) > 1
+
+        # Same 1/distance weighting as tie_breaker(), an exact match counts as inf.
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / distances
+        weights = np.where(one_hot, inverse[:, :, None], 0.0).sum(axis=1)
+        tie_winner = np.where(tied, weights, -np.inf).argmax(axis=1)
+        winner = np.where(tie, tie_winner, votes.argmax(axis=1))
+        return indices, distances, votes, tied, tie, weights, winner
+
+    def predict_many(self, knn, samples):
+        """Vectorized predict() for a (n, 3) matrix of [stem, abm, humss] rows.
+
+        Returns one dict per row with the same keys predict() produces.
+        """
+        indices, distances, votes, tied, tie, weights, winner = self.vote_arrays(knn, samples)
+
+        k = indices.shape[1]
+        strand_list = self.strand_list
+        votes, tied, tie, weights, winner = (
+            votes.tolist(), tied.tolist(), tie.tolist(), weights.tolist(), winner.tolist()
+        )
+        rows = self.training_rows(indices).tolist()
+        indices, distances = indices.tolist(), distances.tolist()
+
+        results = []
+        for row in range(len(indices)):
+            strand_votes = dict(zip(VOTE_KEYS, votes[row]))
+            strand_votes["tie"] = tie[row]
+            strand_votes["tie_strands"] = {
+                WEIGHT_KEYS[j]: weights[row][j] for j in range(len(STRANDS)) if tied[row][j]
+            } if tie[row] else None
+            strand_votes["recommendation"] = STRANDS[winner[row]]
+            strand_votes["neighbors"] = [
+                {
+                    "neighbor_index": r + 1,
+                    "strand": strand_list[i],
+                    "distance": d,
+                } for i, r, d in zip(indices[row], rows[row], distances[row])
+            ]
+            strand_votes["k"] = k
+            results.append(strand_votes)
+        return results
+
     def tie_breaker(self, strand_votes, nearest_neighbors, distances, tie_score):
         tied_strands = {}
         
@@ -160,7 +485,7 @@ class KNN:
                 elif key == "abm_score":
                     tied_strands["abm_weight"] = 0
 
-        print(f"Tie between: {tied_strands}")
+        self.log(f"Tie between: {tied_strands}")
 
         # Calculate weighted distances for tied strands
         for i in range(len(nearest_neighbors)):
@@ -181,12 +506,16 @@ class KNN:
             recommendation = "humss_score"
         elif recommendation == "abm_weight":
             recommendation = "abm_score"
-        print(f"Final Recommendation: {recommendation}")
+        self.log(f"Final Recommendation: {recommendation}")
         
         strand_votes["tie"] = True
         strand_votes["tie_strands"] = tied_strands
         return recommendation
     
+    def log(self, *args):
+        if self.verbose:
+            print(*args)
+
     def fix_recommendation(self, recommendation):
         if recommendation == "stem_weight" or recommendation == "stem_score":
             return "STEM"
@@ -0,0 +1,318 @@
+import csv
+import hashlib
+import io
+import itertools
+import operator
+import os
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import insert
+
+from app import db
+from app.config import Config
+from app.models import Data
+
+STRAND_COLUMNS = (
+    "Strand",
+    "strand",
+    "Is your Senior High School strand aligned with your current course/program?",
+)
+
+# Map long-form strand names to short forms
+STRAND_MAP = {
+    "science, technology, engineering and mathematics": "STEM",
+    "humanities and social sciences": "HUMSS",
+    "accountancy and business management": "ABM"
+}
+
+# Column order of the feature arrays, matching Data/KNN: [stem, abm, humss]
+FEATURE_ORDER = ("STEM", "ABM", "HUMSS")
+
+
+def normalize(text):
+    """Utility to clean question text for reliable matching."""
+    if not text:
+        return ""
+    return (
+        text.strip()
+        .replace("&", "and")    # unify symbols
+        .replace("  ", " ")     # collapse double spaces
+        .lower()                # ignore case
+    )
+
+
+def resolve_strand(raw_strand):
+    """Short strand label (STEM/HUMSS/ABM) for a survey answer, or the answer itself."""
+    norm_strand = normalize(raw_strand)
+    for key, val in STRAND_MAP.items():
+        if key in norm_strand:
+            return val
+    return raw_strand
+
+
+class ScoringPlan:
+    """How to score the rows of one survey file, worked out once from its header.
+
+    Header cells are normalized and matched to questions a single time. Rows
+    can be lists indexed like the header or dicts keyed by it. Scoring a batch
+    is then one int conversion over the answer matrix and a matrix product
+    with the column-to-strand weights.
+    """
+
+    def __init__(self, header, db_questions, keyed=False):
+        # Later duplicates of a header cell win, as they would in dict(zip(header, row))
+        columns = {name: (name if keyed else i) for i, name in enumerate(header)}
+
+        self.strand_keys = [columns[name] for name in STRAND_COLUMNS if name in columns]
+        self.question_names = []
+        self.question_keys = []
+        strands = []
+        for name, key in columns.items():
+            norm_q = normalize(name)
+            if norm_q == "strand" or db_questions.get(norm_q) not in FEATURE_ORDER:
+                continue
+            self.question_names.append(name)
+            self.question_keys.append(key)
+            strands.append(FEATURE_ORDER.index(db_questions[norm_q]))
+
+        # [n_questions, 3] one-hot weights in [stem, abm, humss] order
+        self.weights = np.zeros((len(strands), len(FEATURE_ORDER)), dtype=np.int64)
+        self.weights[np.arange(len(strands)), strands] = 1
+        self.width = len(header)
+        self._labels = {}
+
+    def answers(self, rows):
+        """[n_rows, n_questions] object matrix of the raw answer cells."""
+        if not self.question_keys:
+            return np.empty((len(rows), 0), dtype=object)
+
+        take = operator.itemgetter(*self.question_keys)
+        cells = []
+        for values in rows:
+            try:
+                cells.append(take(values))
+            except (IndexError, KeyError):
+                cells.append(take(self.padded(values)))
+        return np.array(cells, dtype=object).reshape(len(rows), len(self.question_keys))
+
+    def padded(self, values):
+        """A short list row padded with blanks, or a dict row with blank missing keys."""
+        if isinstance(values, dict):
+            return {key: values.get(key) for key in self.question_keys}
+        return list(values) + [None] * (self.width - len(values))
+
+    def label(self, values):
+        for key in self.strand_keys:
+            try:
+                raw_strand = values[key]
+            except (IndexError, KeyError):
+                continue
+            if raw_strand:
+                break
+        else:
+            raw_strand = ""
+
+        if raw_strand not in self._labels:
+            self._labels[raw_strand] = resolve_strand(str(raw_strand).strip())
+        return self._labels[raw_strand]
+
+    def score(self, rows, first_row=2):
+        """Features and strand labels of a batch of rows.
+
+        Returns an int32 [n_rows, 3] array of [stem, abm, humss] totals and the
+        labels. Blank answers count as 0. Any other answer that is not a whole
+        number raises a ValueError that lists every offending question and
+        row, numbered from ``first_row``.
+        """
+        answers = self.answers(rows)
+        answers[~answers.astype(bool)] = 0
+        try:
+            values = answers.astype(np.int64)
+        except (ValueError, TypeError):
+            raise ValueError(self.invalid_message(answers, first_row))
+
+        features = (values @ self.weights).astype(np.int32)
+        return features, [self.label(values) for values in rows]
+
+    def invalid_message(self, answers, first_row):
+        invalid = ~np.frompyfunc(is_whole_number, 1, 1)(answers).astype(bool)
+        problems = []
+        for col in np.flatnonzero(invalid.any(axis=0)):
+            bad_rows = (np.flatnonzero(invalid[:, col]) + first_row).tolist()
+            shown = ", ".join(map(str, bad_rows[:5])) + (f" and {len(bad_rows) - 5} more" if len(bad_rows) > 5 else "")
+            problems.append(f"'{self.question_names[col]}' (row{'s' if len(bad_rows) > 1 else ''} {shown})")
+        return "Invalid score for question " + "; ".join(problems)
+
+
+def is_whole_number(value):
+    try:
+        int(value)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+
+def check_header(header, db_questions):
+    """Questions of the set missing from a file header, and header columns that are not questions."""
+    norm_file_questions = {normalize(q) for q in header if normalize(q) != "strand"}
+    missing_in_file = set(db_questions.keys()) - norm_file_questions
+    extra_in_file = norm_file_questions - set(db_questions.keys())
+    return missing_in_file, extra_in_file
+
+
+def strand_column(header):
+    """Header cell the strand label is read from, or None if the file has none."""
+    return next((name for name in STRAND_COLUMNS if name in header), None)
+
+
+def read_csv(stream):
+    """Header and a lazy row iterator of an uploaded CSV file."""
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, [])
+    return header, (row for row in reader if any(cell.strip() for cell in row))
+
+
+def read_xlsx(stream):
+    """Header and a lazy row iterator of the first sheet of an uploaded XLSX file."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX uploads need the openpyxl package; upload a CSV instead")
+
+    sheet = load_workbook(stream, read_only=True, data_only=True).worksheets[0]
+    rows = sheet.iter_rows(values_only=True)
+    header = ["" if cell is None else str(cell) for cell in next(rows, ())]
+    return header, (row for row in rows if any(cell is not None for cell in row))
+
+
+READERS = {".csv": read_csv, ".xlsx": read_xlsx}
+
+
+def read_upload(file_storage):
+    """Header and lazy rows of an uploaded survey, picked by file extension."""
+    extension = os.path.splitext(file_storage.filename or "")[1].lower()
+    if extension not in READERS:
+        raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+    return READERS[extension](file_storage.stream)
+
+
+def chunked(rows, size):
+    """Group an iterator into lists of at most ``size`` items."""
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, size)):
+        yield chunk
+
+
+def score_chunks(header, rows, db_questions, chunk_size):
+    """Score raw file rows chunk by chunk.
+
+    Yields ``(features, labels)`` per chunk: an int32 array of
+    [stem, abm, humss] totals and the matching strand labels. Only one chunk
+    of raw rows is held at a time.
+    """
+    plan = ScoringPlan(header, db_questions)
+    first_row = 2
+    for chunk in chunked(rows, chunk_size):
+        yield plan.score(chunk, first_row)
+        first_row += len(chunk)
+
+
+def score_upload(header, rows, db_questions):
+    """Features and labels of a whole upload, scored IMPORT_CHUNK_ROWS rows at a time."""
+    feature_chunks, labels = [], []
+    for features, chunk_labels in score_chunks(header, rows, db_questions, Config.IMPORT_CHUNK_ROWS):
+        feature_chunks.append(features)
+        labels.extend(chunk_labels)
+    if not feature_chunks:
+        return np.empty((0, 3), dtype=np.int32), labels
+    return np.concatenate(feature_chunks), labels
+
+
+def save_upload(file_storage):
+    """Copy an upload under DATASET_STORE_DIR/uploads so a background job can read it later."""
+    extension = os.path.splitext(file_storage.filename or "")[1].lower()
+    if extension not in READERS:
+        raise ValueError("Unsupported file type; upload a .csv or .xlsx file")
+
+    directory = os.path.join(Config.DATASET_STORE_DIR, "uploads")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{uuid.uuid4().hex}{extension}")
+    file_storage.save(path)
+    return path
+
+
+@contextmanager
+def open_saved_upload(path):
+    """Header and lazy rows of a file written by save_upload, valid inside the block."""
+    with open(path, "rb") as stream:
+        yield READERS[os.path.splitext(path)[1]](stream)
+
+
+def content_hash(question_set_id, features, labels):
+    """SHA-256 over a scored import, used to find an identical earlier import.
+
+    Covers the question set, the [stem, abm, humss] rows and labels in import
+    order (fold assignment depends on it) and the k range being searched.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{question_set_id}|{Config.KNN_K_MIN}|{Config.KNN_K_MAX}|{len(labels)}|".encode())
+    digest.update(np.ascontiguousarray(features, dtype="<i4").tobytes())
+    digest.update("\x1f".join(map(str, labels)).encode())
+    return digest.hexdigest()
+
+
+def bulk_insert_data(data_set_id, features, labels):
+    """Write scored rows as Data without building ORM objects.
+
+    On PostgreSQL with IMPORT_USE_COPY the rows are streamed through COPY;
+    otherwise they go out as executemany inserts of IMPORT_INSERT_BATCH rows.
+    Both run on the session's connection, inside the import transaction.
+    """
+    if Config.IMPORT_USE_COPY and db.session.get_bind().dialect.name == "postgresql":
+        copy_data(data_set_id, features, labels)
+        return
+
+    for start in range(0, len(labels), Config.IMPORT_INSERT_BATCH):
+        stop = start + Config.IMPORT_INSERT_BATCH
+        db.session.execute(insert(Data), [
+            {
+                "data_set_id": data_set_id,
+                "stem_score": stem,
+                "abm_score": abm,
+                "humss_score": humss,
+                "strand": strand_label,
+            } for (stem, abm, humss), strand_label in zip(features[start:stop].tolist(), labels[start:stop])
+        ])
+
+
+def copy_data(data_set_id, features, labels):
+    # COPY reads an unquoted empty CSV field as NULL; FORCE_NOT_NULL keeps
+    # blank strand labels as '' like the executemany path does
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for (stem, abm, humss), strand_label in zip(features.tolist(), labels):
+        writer.writerow((data_set_id, stem, abm, humss, strand_label))
+    buffer.seek(0)
+
+    connection = db.session.connection().connection.dbapi_connection
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Data.__tablename__} (data_set_id, stem_score, abm_score, humss_score, strand) "
+            "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (strand))",
+            buffer,
+        )
+
+
+def import_sample(data_set_id, features, labels, size=10):
+    """First few scored rows, shaped like Data.data_info() without the id, for the import response."""
+    return [
+        {
+            "data_set_id": data_set_id,
+            "stem_score": stem,
+            "abm_score": abm,
+            "humss_score": humss,
+            "strand": strand_label,
+        } for (stem, abm, humss), strand_label in zip(features[:size].tolist(), labels[:size])
+    ]
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+
+from app import db
+from app.config import Config
+from app.models import Data
+
+RECORD_FIELDS = ("data_id", "data_set_id", "stem_score", "abm_score", "humss_score", "strand")
+
+STREAM_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def record_fields(fields):
+    """Columns named by a ``fields=a,b`` projection, always led by the data_id cursor."""
+    if not fields:
+        return list(RECORD_FIELDS)
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in RECORD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown record field(s): {', '.join(unknown)}")
+    return ["data_id"] + [name for name in dict.fromkeys(names) if name != "data_id"]
+
+
+def records_query(data_set_id, names, after=None, limit=None):
+    """Select of a dataset's rows as plain tuples, in data_id order, starting after the ``after`` cursor."""
+    query = (
+        select(*(getattr(Data, name) for name in names))
+        .where(Data.data_set_id == data_set_id)
+        .order_by(Data.data_id)
+    )
+    if after is not None:
+        query = query.where(Data.data_id > after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def fetch_records(data_set_id, names, after=None, limit=None):
+    rows = db.session.execute(records_query(data_set_id, names, after, limit))
+    return [dict(zip(names, row)) for row in rows]
+
+
+def fetch_page(data_set_id, names, after, limit):
+    """One keyset page and the cursor of the next one (None on the last page)."""
+    records = fetch_records(data_set_id, names, after, limit + 1)
+    has_more = len(records) > limit
+    records = records[:limit]
+    return {
+        "records": records,
+        "limit": limit,
+        "next_after": records[-1]["data_id"] if has_more else None,
+    }
+
+
+def stream_records(data_set_id, names, fmt, after=None):
+    """NDJSON or CSV text of a dataset's rows, read through a server-side cursor.
+
+    Yields one chunk per RECORDS_STREAM_BATCH rows, so memory stays flat
+    however big the dataset is.
+    """
+    result = db.session.execute(
+        records_query(data_set_id, names, after).execution_options(yield_per=Config.RECORDS_STREAM_BATCH)
+    )
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for partition in result.partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for partition in result.partitions():
+            yield "".join(json.dumps(dict(zip(names, row))) + "\n" for row in partition)
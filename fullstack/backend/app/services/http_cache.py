@@ -0,0 +1,117 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import select, update
+
+from app import db
+from app.config import Config
+from app.models import CacheVersion
+
+
+class ResponseCache:
+    """LRU cache of rendered JSON bodies, keyed by resource and request path.
+
+    Each entry remembers the ETag it was rendered under, so a body is only
+    reused while the resource's version token is unchanged. Bounded by entry
+    count and by total bytes.
+    """
+
+    def __init__(self, max_size, max_bytes):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, resource, path, etag):
+        with self._lock:
+            entry = self._entries.get((resource, path))
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end((resource, path))
+            return entry[1]
+
+    def put(self, resource, path, etag, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._pop((resource, path))
+            self._entries[(resource, path)] = (etag, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_size or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, *resources):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in resources]:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+
+response_cache = ResponseCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_MAX_BYTES)
+
+
+def bump_version(*resources):
+    """Mark resources as changed, in the caller's transaction, and drop their cached bodies here."""
+    for resource in resources:
+        bumped = db.session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.resource == resource)
+            .values(version=CacheVersion.version + 1)
+        ).rowcount
+        if not bumped:
+            db.session.add(CacheVersion(resource=resource, version=1))
+    db.session.flush()
+    response_cache.invalidate(*resources)
+
+
+def version_token(resource, aggregates):
+    """The resource's generation plus cheap aggregates (counts, max timestamps/ids), in one query."""
+    generation = select(CacheVersion.version).where(CacheVersion.resource == resource).scalar_subquery()
+    row = db.session.execute(select(generation, *(query.scalar_subquery() for query in aggregates))).one()
+    return "|".join(map(str, row))
+
+
+def conditional(resource, aggregates):
+    """Serve a JSON GET view with ETags and cached bodies.
+
+    ``aggregates(**view_args)`` returns single-value selects whose results,
+    together with the resource's generation, change whenever the payload
+    can. A matching If-None-Match gets 304 without running the view; an
+    unchanged token reuses the rendered body.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**view_args):
+            token = version_token(resource, aggregates(**view_args))
+            etag = hashlib.sha1(f"{request.full_path}|{token}".encode()).hexdigest()
+
+            if etag in request.if_none_match:
+                response = current_app.response_class(status=304)
+            else:
+                body = response_cache.get(resource, request.full_path, etag)
+                if body is not None:
+                    response = current_app.response_class(body, mimetype="application/json")
+                else:
+                    response = make_response(view(**view_args))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.put(resource, request.full_path, etag, response.get_data())
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import update
+
+from app import db
+from app.config import Config
+from app.models import Job
+
+executor = ThreadPoolExecutor(max_workers=Config.JOB_WORKERS, thread_name_prefix="job")
+
+
+class JobProgress:
+    """Phase/progress reporter handed to a job's task.
+
+    Updates are written on their own connection and committed at once, so
+    /jobs/<id> sees them while the task's session is still working.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.timings = {}
+        self._phase = None
+        self._started = None
+
+    def phase(self, name, progress):
+        """Close the running phase and start ``name`` at ``progress`` (0..1)."""
+        self._close_phase()
+        self._phase, self._started = name, time.perf_counter()
+        self.update(phase=name, progress=progress, timings=dict(self.timings))
+
+    def finish(self, **values):
+        self._close_phase()
+        self.update(timings=dict(self.timings), finished_at=datetime.now(timezone.utc), **values)
+
+    def _close_phase(self):
+        if self._phase is not None:
+            self.timings[self._phase] = round(time.perf_counter() - self._started, 4)
+            self._phase = None
+
+    def update(self, **values):
+        with db.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.job_id == self.job_id).values(**values))
+
+
+class NoProgress:
+    """Stand-in reporter for running a job's task inline in a request."""
+
+    def phase(self, name, progress):
+        pass
+
+
+def submit_job(kind, task, *args):
+    """Queue ``task(progress, *args)`` on the local worker pool and return its Job row.
+
+    The task runs in an app context of its own and returns a JSON-able
+    result; a "data_set_id" key in it is copied onto the job.
+    """
+    job = Job(kind=kind, status="Queued", phase="queued", progress=0.0, timings={})
+    db.session.add(job)
+    db.session.commit()
+
+    executor.submit(run_job, current_app._get_current_object(), job.job_id, task, args)
+    print(f"🧵 Queued {kind} job {job.job_id}")
+    return job
+
+
+def run_job(app, job_id, task, args):
+    with app.app_context():
+        progress = JobProgress(job_id)
+        progress.update(status="Running", started_at=datetime.now(timezone.utc))
+        try:
+            result = task(progress, *args)
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Job {job_id} failed:", str(e))
+            progress.finish(status="Failed", error=str(e))
+        else:
+            progress.finish(
+                status="Succeeded",
+                phase="done",
+                progress=1.0,
+                result=result,
+                data_set_id=(result or {}).get("data_set_id"),
+            )
+            print(f"✅ Job {job_id} finished")
+        finally:
+            db.session.remove()
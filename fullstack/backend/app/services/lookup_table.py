@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+from datetime import timezone
+
+import numpy as np
+from sqlalchemy import func
+
+from app import db
+from app.config import Config
+from app.models import Question
+from app.services.KNN import STRANDS, VOTE_KEYS, WEIGHT_KEYS
+from app.services.store_files import temp_path, publish, discard
+
+# One cell per reachable (stem, abm, humss) total. Votes and tie weights are
+# stored in STRANDS order; tie weights of strands that were not tied are NaN.
+TABLE_DTYPE = np.dtype([
+    ("recommendation", np.uint8),
+    ("votes", np.uint16, len(STRANDS)),
+    ("tie", np.bool_),
+    ("tie_weights", np.float64, len(STRANDS)),
+])
+CHUNK_SIZE = 65536
+LIKERT_MAX = 5
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def table_dir(data_set_id):
+    """Directory holding a dataset's table.npy and the meta.json it was built under."""
+    return os.path.join(Config.DATASET_STORE_DIR, f"lookup_{data_set_id}")
+
+
+def dataset_version(dataset):
+    """(best_k, last_updated) of a dataset; a table is only served while they are unchanged."""
+    stamp = dataset.last_updated
+    if stamp is not None and stamp.tzinfo is not None:
+        stamp = stamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return [dataset.best_k, stamp.isoformat() if stamp is not None else None]
+
+
+def score_bounds(question_set_id):
+    """Highest reachable [stem, abm, humss] total for a question set.
+
+    Every question is answered on a 1-5 scale and blank answers count as 0 on
+    import, so each total lies in 0..5 * (number of questions of that strand).
+    """
+    counts = dict(
+        db.session.query(Question.strand, func.count(Question.question_id))
+        .filter(Question.set_id == question_set_id)
+        .group_by(Question.strand)
+        .all()
+    )
+    return [LIKERT_MAX * counts.get(strand, 0) for strand in ("STEM", "ABM", "HUMSS")]
+
+
+def build_lookup_table(dataset, runner):
+    """Precompute the recommendation for every reachable score triple of a dataset.
+
+    Returns the path of the written table, or None when the lattice is larger
+    than LOOKUP_TABLE_MAX_CELLS and the dataset is served from the model only.
+    """
+    shape = tuple(bound + 1 for bound in score_bounds(dataset.question_set_id))
+    cells = int(np.prod(shape))
+    if cells > Config.LOOKUP_TABLE_MAX_CELLS:
+        print(f"⚠️ Skipping lookup table for dataset {dataset.data_set_id}: {cells} cells")
+        return None
+
+    path = table_dir(dataset.data_set_id)
+    tmp_path = temp_path(path)
+    os.makedirs(tmp_path, exist_ok=True)
+
+    table = np.lib.format.open_memmap(os.path.join(tmp_path, "table.npy"), mode="w+", dtype=TABLE_DTYPE, shape=shape)
+    flat = table.reshape(-1)
+    for start in range(0, cells, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, cells)
+        samples = np.column_stack(np.unravel_index(np.arange(start, stop), shape))
+        _, _, votes, tied, tie, weights, winner = runner.vote_arrays(runner.model, samples)
+
+        chunk = flat[start:stop]
+        chunk["recommendation"] = winner
+        chunk["votes"] = votes
+        chunk["tie"] = tie
+        chunk["tie_weights"] = np.where(tied & tie[:, None], weights, np.nan)
+    table.flush()
+    del table, flat
+
+    # What predict() reports alongside the votes, and the dataset state they came from
+    meta = {
+        "version": dataset_version(dataset),
+        "k": runner.k,
+        "best_k": runner.best_k,
+        "accuracy": runner.accuracy,
+    }
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    publish(tmp_path, path)
+    drop_lookup_table(dataset.data_set_id, remove_file=False)
+    print(f"✅ Lookup table for dataset {dataset.data_set_id}: {shape} -> {path}")
+    return path
+
+
+def load_lookup_table(data_set_id):
+    """Memory-mapped table of a dataset and its meta, or None if it was never built."""
+    path = table_dir(data_set_id)
+    try:
+        stat = os.stat(os.path.join(path, "meta.json"))
+    except FileNotFoundError:
+        return None
+
+    # Another worker may have rebuilt the table, so the meta file's identity is part of the key.
+    key = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        entry = _tables.get(data_set_id)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        table = np.load(os.path.join(path, "table.npy"), mmap_mode="r")
+    except FileNotFoundError:
+        return None
+    with _lock:
+        _tables[data_set_id] = (key, (table, meta))
+    return table, meta
+
+
+def lookup(dataset, sample):
+    """Recommendation for one [stem, abm, humss] sample straight from the table.
+
+    Returns what predict() returns without the neighbor list, or None when the
+    dataset has no table, the table was built for another best_k or
+    last_updated (a retune or rebuild not yet finished here), or the sample
+    is not an integer point inside it.
+    """
+    entry = load_lookup_table(dataset.data_set_id)
+    if entry is None:
+        return None
+    table, meta = entry
+    if meta["version"] != dataset_version(dataset):
+        return None
+    if any(float(value) != int(value) for value in sample):
+        return None
+    index = tuple(int(value) for value in sample)
+    if any(i < 0 or i >= size for i, size in zip(index, table.shape)):
+        return None
+
+    cell = table[index]
+    strand_votes = dict(zip(VOTE_KEYS, cell["votes"].tolist()))
+    strand_votes["tie"] = bool(cell["tie"])
+    strand_votes["tie_strands"] = {
+        WEIGHT_KEYS[j]: weight for j, weight in enumerate(cell["tie_weights"].tolist())
+        if not np.isnan(weight)
+    } if cell["tie"] else None
+    strand_votes["recommendation"] = STRANDS[cell["recommendation"]]
+    strand_votes["k"] = meta["k"]
+    strand_votes["best_k"] = meta["best_k"]
+    strand_votes["accuracy"] = meta["accuracy"]
+    return strand_votes
+
+
+def drop_lookup_table(data_set_id, remove_file=True):
+    with _lock:
+        _tables.pop(data_set_id, None)
+    if remove_file:
+        discard(table_dir(data_set_id))
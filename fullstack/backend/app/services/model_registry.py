@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import threading
+
+from app.config import Config
+from app.services.KNN import KNN
+from app.services.snapshot import load_snapshot, build_snapshot
+
+
+def load_training_data(data_set_id):
+    """Feature rows ([stem, abm, humss]) and strand labels of a dataset, in insert order.
+
+    Served from the dataset's memory-mapped snapshot, which is built from the
+    Data rows the first time it is missing.
+    """
+    snapshot = load_snapshot(data_set_id) or build_snapshot(data_set_id)
+    return snapshot["features"], snapshot["classes"][snapshot["labels"]]
+
+
+class ModelRegistry:
+    """LRU cache of fitted KNN runners, one per dataset.
+
+    Entries are keyed by ``data_set_id`` and remember the ``last_updated`` value
+    they were built from, so a dataset that changed since is refitted on the
+    next lookup even if nobody invalidated it explicitly.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, dataset):
+        version = dataset.last_updated
+        with self._lock:
+            entry = self._entries.get(dataset.data_set_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(dataset.data_set_id)
+                return entry[1]
+
+        # Fit outside the lock so one slow dataset does not block the others.
+        runner = self.build(dataset)
+        with self._lock:
+            self._entries[dataset.data_set_id] = (version, runner)
+            self._entries.move_to_end(dataset.data_set_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return runner
+
+    def build(self, dataset):
+        X, y = load_training_data(dataset.data_set_id)
+        if Config.KNN_APPROX_COLLAPSE_DUPLICATES and len(X):
+            runner = KNN.collapsed(None, X, y)
+        else:
+            runner = KNN(None, X, y)
+        if Config.KNN_SERVING_MODE == "stored" and dataset.best_k:
+            runner.fit(dataset.best_k, dataset.accuracy)
+        else:
+            k, acc, _, _ = runner.calculate_k()
+            runner.fit(k, acc)
+        return runner
+
+    def invalidate(self, *data_set_ids):
+        with self._lock:
+            for data_set_id in data_set_ids:
+                self._entries.pop(data_set_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+model_registry = ModelRegistry(max_size=Config.MODEL_CACHE_SIZE)
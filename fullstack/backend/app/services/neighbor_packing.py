@@ -0,0 +1,40 @@
+import numpy as np
+
+from app.services.KNN import STRANDS
+
+# Fixed-width record per neighbor, stored back to back in Results.neighbors_packed.
+# Distances stay float64 so unpacked values equal the ones Neighbors rows hold.
+NEIGHBOR_DTYPE = np.dtype([
+    ("neighbor_index", "<i4"),
+    ("strand", "u1"),
+    ("distance", "<f8"),
+])
+
+
+def pack_neighbors(neighbors):
+    """Bytes for a list of {neighbor_index, strand, distance} dicts.
+
+    Returns None when a neighbor's strand is not one of STRANDS; such results
+    keep their neighbors as Neighbors rows.
+    """
+    if any(neighbor["strand"] not in STRANDS for neighbor in neighbors):
+        return None
+    packed = np.empty(len(neighbors), dtype=NEIGHBOR_DTYPE)
+    packed["neighbor_index"] = [neighbor["neighbor_index"] for neighbor in neighbors]
+    packed["strand"] = [STRANDS.index(neighbor["strand"]) for neighbor in neighbors]
+    packed["distance"] = [neighbor["distance"] for neighbor in neighbors]
+    return packed.tobytes()
+
+
+def unpack_neighbors(data):
+    """The neighbor dicts GET /results/ returns, from packed bytes."""
+    packed = np.frombuffer(data, dtype=NEIGHBOR_DTYPE)
+    return [
+        {
+            "neighbor_index": index,
+            "strand": STRANDS[code],
+            "distance": distance or 0,
+        } for index, code, distance in zip(
+            packed["neighbor_index"].tolist(), packed["strand"].tolist(), packed["distance"].tolist()
+        )
+    ]
@@ -0,0 +1,41 @@
+import threading
+
+from app import db
+from app.models import Question, QuestionSet
+from app.services.dataset_import import normalize
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def question_index(question_set_id):
+    """Normalized question text -> strand for a question set, or None if it has no questions.
+
+    Cached per set and checked against the set's last_updated, which every
+    question edit bumps, so an import only costs one primary-key lookup.
+    """
+    question_set = db.session.get(QuestionSet, question_set_id)
+    if question_set is None:
+        return None
+
+    version = question_set.last_updated
+    with _lock:
+        entry = _indexes.get(question_set_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+    questions = (
+        db.session.query(Question.question_text, Question.strand)
+        .filter(Question.set_id == question_set_id)
+        .all()
+    )
+    index = {normalize(text): strand for text, strand in questions} or None
+    with _lock:
+        _indexes[question_set_id] = (version, index)
+    return index
+
+
+def drop_question_index(*question_set_ids):
+    with _lock:
+        for question_set_id in question_set_ids:
+            _indexes.pop(question_set_id, None)
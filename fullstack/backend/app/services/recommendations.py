@@ -0,0 +1,101 @@
+from sqlalchemy import insert
+
+from app import db
+from app.config import Config
+from app.models import DataSet, Results, Neighbors, TieTable
+from app.services.KNN import VOTE_KEYS, WEIGHT_KEYS
+from app.services.model_registry import model_registry
+from app.services.neighbor_packing import pack_neighbors
+
+
+def default_description(prediction):
+    return (
+        f"{prediction['recommendation']} is the recommended strand based on the "
+        f"{prediction['k']} most similar survey responses."
+    )
+
+
+def save_recommendations(entries):
+    """Write recommendations with their neighbors and tie weights in three statements.
+
+    ``entries`` are ``(assessment_id, prediction, description)`` tuples, where
+    ``prediction`` is a predict()/predict_many() result with its neighbor
+    list. The results go in as one multi-row INSERT ... RETURNING, whose ids
+    then key one multi-row insert of all neighbors and one of all tie rows,
+    however many recommendations there are. Runs in the caller's transaction
+    and returns the new results_ids in entry order.
+
+    With RESULTS_COMPACT_NEIGHBORS the neighbors are packed onto the results
+    rows instead, and only results that cannot be packed get neighbor rows.
+    """
+    if not entries:
+        return []
+
+    packed = [
+        pack_neighbors(prediction.get("neighbors") or []) if Config.RESULTS_COMPACT_NEIGHBORS else None
+        for _, prediction, _ in entries
+    ]
+
+    results_ids = db.session.scalars(
+        insert(Results).returning(Results.results_id, sort_by_parameter_order=True),
+        [
+            {
+                **{key: prediction[key] for key in VOTE_KEYS},
+                "tie": prediction["tie"],
+                "recommended_strand": prediction["recommendation"],
+                "recommendation_description": description or default_description(prediction),
+                "assessment_id": assessment_id,
+                "neighbors_packed": neighbors_packed,
+            } for (assessment_id, prediction, description), neighbors_packed in zip(entries, packed)
+        ],
+    ).all()
+
+    neighbor_rows = [
+        {
+            "results_id": results_id,
+            "neighbor_index": neighbor["neighbor_index"],
+            "strand": neighbor["strand"],
+            "distance": neighbor["distance"],
+        }
+        for results_id, (_, prediction, _), neighbors_packed in zip(results_ids, entries, packed)
+        if neighbors_packed is None
+        for neighbor in prediction.get("neighbors") or ()
+    ]
+    if neighbor_rows:
+        db.session.execute(insert(Neighbors), neighbor_rows)
+
+    # Strands outside the tie get weight 0
+    tie_rows = [
+        {"results_id": results_id, **{key: prediction["tie_strands"].get(key, 0.0) for key in WEIGHT_KEYS}}
+        for results_id, (_, prediction, _) in zip(results_ids, entries)
+        if prediction["tie"] and prediction.get("tie_strands")
+    ]
+    if tie_rows:
+        db.session.execute(insert(TieTable), tie_rows)
+
+    return results_ids
+
+
+def recommend_assessments(assessments):
+    """Score assessments against their datasets' models and save the recommendations.
+
+    Samples are the assessments' [stem, abm, humss] totals. Assessments are
+    grouped by dataset so each model scores its batch in one predict_many
+    call. Returns ``(assessment, results_id, prediction)`` per assessment.
+    """
+    by_dataset = {}
+    for assessment in assessments:
+        by_dataset.setdefault(assessment.data_set_id, []).append(assessment)
+
+    scored = []
+    for data_set_id, group in by_dataset.items():
+        dataset = db.session.get(DataSet, data_set_id)
+        runner = model_registry.get(dataset)
+        samples = [[a.stem_total, a.abm_total, a.humss_total] for a in group]
+        scored.extend(zip(group, runner.predict_many(runner.model, samples)))
+
+    results_ids = save_recommendations([
+        (assessment.assessment_id, prediction, None)
+        for assessment, prediction in scored
+    ])
+    return [(assessment, results_id, prediction) for (assessment, prediction), results_id in zip(scored, results_ids)]
@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+
+from app import db
+from app.config import Config
+from app.models import Results, Assessment, Neighbors, TieTable
+from app.services.neighbor_packing import unpack_neighbors
+
+# One flat row per result; neighbors are a JSON list in CSV and a list column in Parquet
+EXPORT_FIELDS = (
+    "results_id", "assessment_id", "user_id", "data_set_id", "course_id",
+    "recommended_strand", "tie", "recommendation_description",
+    "stem_score", "humss_score", "abm_score",
+    "stem_total", "humss_total", "abm_total",
+    "stem_weight", "humss_weight", "abm_weight",
+    "created_at", "neighbors",
+)
+
+EXPORT_TYPES = {
+    "csv": ("text/csv", "results.csv"),
+    "parquet": ("application/vnd.apache.parquet", "results.parquet"),
+}
+
+
+def export_query():
+    """Select of every result with its assessment totals and tie weights, in results_id order."""
+    return (
+        select(
+            Results.results_id, Results.assessment_id, Assessment.user_id, Assessment.data_set_id,
+            Assessment.course_id, Results.recommended_strand, Results.tie,
+            Results.recommendation_description,
+            Results.stem_score, Results.humss_score, Results.abm_score,
+            Assessment.stem_total, Assessment.humss_total, Assessment.abm_total,
+            TieTable.stem_weight, TieTable.humss_weight, TieTable.abm_weight,
+            Results.created_at, Results.neighbors_packed,
+        )
+        .outerjoin(Assessment, Assessment.assessment_id == Results.assessment_id)
+        .outerjoin(TieTable, TieTable.results_id == Results.results_id)
+        .order_by(Results.results_id)
+    )
+
+
+def neighbor_rows(results_ids):
+    """Neighbors of results kept as Neighbors rows, by results_id, in one query."""
+    neighbors = defaultdict(list)
+    if not results_ids:
+        return neighbors
+    rows = db.session.execute(
+        select(Neighbors.results_id, Neighbors.neighbor_index, Neighbors.strand, Neighbors.distance)
+        .where(Neighbors.results_id.in_(results_ids))
+        .order_by(Neighbors.results_id, Neighbors.neighbor_index)
+    )
+    for results_id, index, strand, distance in rows:
+        neighbors[results_id].append({"neighbor_index": index, "strand": strand, "distance": distance or 0})
+    return neighbors
+
+
+def export_batches(query):
+    """Lists of flat export rows, read through a server-side cursor RESULTS_EXPORT_BATCH results at a time."""
+    result = db.session.execute(query.execution_options(yield_per=Config.RESULTS_EXPORT_BATCH))
+    for partition in result.partitions():
+        neighbors = neighbor_rows([row.results_id for row in partition if row.neighbors_packed is None])
+        yield [
+            {
+                **row._asdict(),
+                "neighbors": (
+                    unpack_neighbors(row.neighbors_packed) if row.neighbors_packed is not None
+                    else neighbors.get(row.results_id, [])
+                ),
+            } for row in partition
+        ]
+
+
+def stream_csv(query):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for batch in export_batches(query):
+        for row in batch:
+            row["created_at"] = row["created_at"].isoformat() if row["created_at"] else None
+            row["neighbors"] = json.dumps(row["neighbors"])
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def require_pyarrow():
+    """The pyarrow modules Parquet export writes with; raises ValueError when it is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow (listed in requirements.txt), which is not installed here; use format=csv instead")
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_schema(pa):
+    return pa.schema([
+        ("results_id", pa.int64()),
+        ("assessment_id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("data_set_id", pa.int64()),
+        ("course_id", pa.int64()),
+        ("recommended_strand", pa.string()),
+        ("tie", pa.bool_()),
+        ("recommendation_description", pa.string()),
+        ("stem_score", pa.int64()),
+        ("humss_score", pa.int64()),
+        ("abm_score", pa.int64()),
+        ("stem_total", pa.float64()),
+        ("humss_total", pa.float64()),
+        ("abm_total", pa.float64()),
+        ("stem_weight", pa.float64()),
+        ("humss_weight", pa.float64()),
+        ("abm_weight", pa.float64()),
+        ("created_at", pa.timestamp("us")),
+        ("neighbors", pa.list_(pa.struct([
+            ("neighbor_index", pa.int32()),
+            ("strand", pa.string()),
+            ("distance", pa.float64()),
+        ]))),
+    ])
+
+
+class DrainedSink(io.RawIOBase):
+    """Write-only file that hands its bytes to the caller after each row group.
+
+    ``tell`` keeps counting across drains so the Parquet footer gets the
+    right offsets.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(query):
+    """Parquet bytes with one row group per batch, yielded as each group is written."""
+    pa, pq = require_pyarrow()
+    schema = parquet_schema(pa)
+    sink = DrainedSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in export_batches(query):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(query, fmt):
+    return stream_parquet(query) if fmt == "parquet" else stream_csv(query)
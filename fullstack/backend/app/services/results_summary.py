@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import case, func, or_, select
+
+from app import db
+from app.config import Config
+from app.models import Results, Assessment, DataSet, ResultsSummary, ResultsSummaryState
+
+GROUP_KEYS = ("day", "data_set_id", "course_id", "recommended_strand")
+MEASURES = ("result_count", "tie_count", "stem_score_sum", "humss_score_sum", "abm_score_sum")
+
+
+def summary_state():
+    """The watermark row, locked for this transaction so two refreshes cannot both fold the same results."""
+    state = db.session.get(ResultsSummaryState, 1, with_for_update=True)
+    if state is None:
+        state = ResultsSummaryState(results_summary_state_id=1, last_results_id=0)
+        db.session.add(state)
+        db.session.flush()
+    return state
+
+
+def as_date(value):
+    # func.date() gives a date on PostgreSQL and an ISO string on SQLite
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def settled_high(low, high):
+    """Highest results_id up to ``high`` that can be folded without skipping one still being written.
+
+    Ids come from the sequence before the inserting transaction commits, so a
+    missing id may show up later. A gap whose next row was created within
+    RESULTS_SUMMARY_SETTLE_MINUTES stops the watermark just below it; older
+    gaps are rolled-back or deleted results.
+    """
+    cutoff = db.session.scalar(select(func.now())) - timedelta(minutes=Config.RESULTS_SUMMARY_SETTLE_MINUTES)
+    ids = (
+        select(
+            Results.results_id,
+            Results.created_at,
+            func.lag(Results.results_id, 1, low).over(order_by=Results.results_id).label("previous_id"),
+        )
+        .where(Results.results_id > low, Results.results_id <= high)
+        .subquery()
+    )
+    first_recent_gap = db.session.scalar(
+        select(func.min(ids.c.previous_id))
+        .where(ids.c.results_id - ids.c.previous_id > 1, ids.c.created_at >= cutoff)
+    )
+    return high if first_recent_gap is None else first_recent_gap
+
+
+def refresh_results_summary(full=False):
+    """Fold results newer than the watermark into results_summary and commit.
+
+    Only new rows are aggregated, so a refresh costs the same however large
+    Results has grown. The watermark waits at ids that may still commit (see
+    settled_high), so their results are folded by a later refresh instead of
+    being skipped. ``full`` rebuilds the table from scratch, which also
+    picks up results deleted since they were counted.
+    """
+    state = summary_state()
+    if full:
+        db.session.query(ResultsSummary).delete()
+        state.last_results_id = 0
+
+    high = db.session.query(func.max(Results.results_id)).scalar() or 0
+    low = state.last_results_id
+    if high > low:
+        high = settled_high(low, high)
+    groups = []
+    if high > low:
+        groups = (
+            db.session.query(
+                func.date(Results.created_at),
+                Assessment.data_set_id,
+                Assessment.course_id,
+                Results.recommended_strand,
+                func.count(Results.results_id),
+                func.sum(case((Results.tie.is_(True), 1), else_=0)),
+                func.sum(Results.stem_score),
+                func.sum(Results.humss_score),
+                func.sum(Results.abm_score),
+            )
+            .outerjoin(Assessment, Assessment.assessment_id == Results.assessment_id)
+            .filter(Results.results_id > low, Results.results_id <= high)
+            .group_by(
+                func.date(Results.created_at),
+                Assessment.data_set_id,
+                Assessment.course_id,
+                Results.recommended_strand,
+            )
+            .all()
+        )
+
+    # Summary rows of the days touched, to add the new counts onto
+    existing = {}
+    days = {as_date(group[0]) for group in groups}
+    conditions = [ResultsSummary.day.in_(days - {None})]
+    if None in days:
+        conditions.append(ResultsSummary.day.is_(None))
+    if days:
+        for row in ResultsSummary.query.filter(or_(*conditions)):
+            existing[tuple(getattr(row, key) for key in GROUP_KEYS)] = row
+
+    for group in groups:
+        key = (as_date(group[0]),) + tuple(group[1:4])
+        row = existing.get(key)
+        if row is None:
+            row = ResultsSummary(**dict(zip(GROUP_KEYS, key)), **dict.fromkeys(MEASURES, 0))
+            db.session.add(row)
+            existing[key] = row
+        for measure, value in zip(MEASURES, group[4:]):
+            setattr(row, measure, getattr(row, measure) + int(value or 0))
+
+    state.last_results_id = max(high, low)
+    state.refreshed_at = datetime.now(timezone.utc)
+    db.session.commit()
+    return {"results_folded_up_to": state.last_results_id, "groups_updated": len(groups), "full": full}
+
+
+def summary_entry(count, ties, stem, humss, abm):
+    count = int(count or 0)
+    return {
+        "count": count,
+        "avg_stem_score": float(stem) / count if count else None,
+        "avg_humss_score": float(humss) / count if count else None,
+        "avg_abm_score": float(abm) / count if count else None,
+        "tie_rate": float(ties) / count if count else None,
+    }
+
+
+def summarize_by(*columns):
+    """Rows of results_summary rolled up by ``columns`` (none for the grand total)."""
+    query = db.session.query(
+        *columns,
+        *(func.sum(getattr(ResultsSummary, measure)) for measure in MEASURES),
+    )
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+    return query.all()
+
+
+def results_summary():
+    """Counts, score averages and tie rates per strand, dataset, course and day."""
+    state = db.session.get(ResultsSummaryState, 1)
+    names = dict(db.session.query(DataSet.data_set_id, DataSet.data_set_name))
+
+    total = summarize_by()[0]
+    return {
+        "refreshed_at": state.refreshed_at.isoformat() if state and state.refreshed_at else None,
+        "last_results_id": state.last_results_id if state else 0,
+        "total": summary_entry(*total),
+        "by_strand": [
+            {"recommended_strand": strand, **summary_entry(*measures)}
+            for strand, *measures in summarize_by(ResultsSummary.recommended_strand)
+        ],
+        "by_dataset": [
+            {"data_set_id": data_set_id, "data_set_name": names.get(data_set_id), **summary_entry(*measures)}
+            for data_set_id, *measures in summarize_by(ResultsSummary.data_set_id)
+        ],
+        "by_course": [
+            {"course_id": course_id, **summary_entry(*measures)}
+            for course_id, *measures in summarize_by(ResultsSummary.course_id)
+        ],
+        "by_day": [
+            {"day": as_date(day).isoformat() if day else None, **summary_entry(*measures)}
+            for day, *measures in summarize_by(ResultsSummary.day)
+        ],
+    }
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+from sqlalchemy import select
+
+from app import db
+from app.config import Config
+from app.models import Data
+from app.services.store_files import temp_path, publish, discard
+
+# One .npy file per column. Features are [stem, abm, humss] totals; labels
+# are codes into classes, which holds the distinct strand labels.
+COLUMNS = ("data_id", "features", "labels", "classes")
+
+
+def snapshot_dir(data_set_id):
+    return os.path.join(Config.DATASET_STORE_DIR, f"snapshot_{data_set_id}")
+
+
+def feature_dtype(features):
+    """int16 when every total fits, which it does for any realistic question set."""
+    if len(features) and np.abs(features).max() > np.iinfo(np.int16).max:
+        return np.int32
+    return np.int16
+
+
+def snapshot_columns(data_ids, features, labels):
+    """Columns of a snapshot for rows given in data_id order."""
+    classes, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+    return {
+        "data_id": np.asarray(data_ids, dtype=np.int64),
+        "features": np.ascontiguousarray(features, dtype=feature_dtype(features)).reshape(-1, 3),
+        "labels": codes.astype(np.uint8 if len(classes) <= 256 else np.int32).ravel(),
+        "classes": classes,
+    }
+
+
+def write_snapshot(data_set_id, columns, replace=False):
+    """Write snapshot columns to disk.
+
+    A dataset's rows never change after import, so a lazily built snapshot
+    keeps one that already exists. An import passes ``replace`` so a file
+    left behind under a reused data_set_id cannot survive it.
+    """
+    path = snapshot_dir(data_set_id)
+    tmp_path = temp_path(path)
+    os.makedirs(tmp_path, exist_ok=True)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+    return publish(tmp_path, path, replace=replace)
+
+
+def snapshot_import(data_set_id, features, labels):
+    """Snapshot rows just inserted for a dataset, fetching only their new data_ids."""
+    os.makedirs(Config.DATASET_STORE_DIR, exist_ok=True)
+    data_ids = np.fromiter(
+        db.session.scalars(
+            select(Data.data_id).where(Data.data_set_id == data_set_id).order_by(Data.data_id)
+        ),
+        dtype=np.int64,
+    )
+    return write_snapshot(data_set_id, snapshot_columns(data_ids, features, labels), replace=True)
+
+
+def build_snapshot(data_set_id):
+    """Snapshot a dataset from its Data rows, read as plain tuples, and return its columns.
+
+    The columns are still returned if the store directory cannot be written.
+    """
+    rows = db.session.execute(
+        select(Data.data_id, Data.stem_score, Data.abm_score, Data.humss_score, Data.strand)
+        .where(Data.data_set_id == data_set_id)
+        .order_by(Data.data_id)
+    ).all()
+    data_ids, stem, abm, humss, labels = zip(*rows) if rows else ((), (), (), (), ())
+    features = np.column_stack([stem, abm, humss]) if rows else np.empty((0, 3), dtype=np.int16)
+    columns = snapshot_columns(data_ids, features, labels)
+    try:
+        os.makedirs(Config.DATASET_STORE_DIR, exist_ok=True)
+        write_snapshot(data_set_id, columns)
+    except OSError as e:
+        print(f"⚠️ Could not write snapshot for dataset {data_set_id}:", str(e))
+    return columns
+
+
+def load_snapshot(data_set_id):
+    """Memory-mapped columns of a dataset's snapshot, or None if it has none."""
+    path = snapshot_dir(data_set_id)
+    try:
+        return {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+    except FileNotFoundError:
+        return None
+
+
+def drop_snapshot(data_set_id):
+    discard(snapshot_dir(data_set_id))
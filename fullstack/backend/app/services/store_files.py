@@ -0,0 +1,50 @@
+import os
+import shutil
+import threading
+
+
+def temp_path(path):
+    """Private name next to ``path`` for one writer (process and thread) to build it under."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def publish(tmp_path, path, replace=True):
+    """Move a finished file or directory from ``tmp_path`` to ``path`` with a rename.
+
+    Readers of ``path`` see the old version or the new one, never a
+    half-written one. A directory cannot be renamed over another, so an
+    existing one is first renamed aside and removed afterwards; readers
+    arriving in between find nothing and fall back as they would for a
+    missing file. Without ``replace`` an existing ``path`` is kept and the
+    new copy discarded.
+    """
+    old_path = None
+    if replace and os.path.isdir(path):
+        old_path = f"{temp_path(path)}.old"
+        try:
+            os.replace(path, old_path)
+        except FileNotFoundError:
+            old_path = None
+
+    if not replace and os.path.exists(path):
+        discard(tmp_path)
+    else:
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another writer published its directory first
+            discard(tmp_path)
+
+    if old_path is not None:
+        discard(old_path)
+    return path
+
+
+def discard(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,120 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.metrics import confusion_matrix
+
+
+def fold_predictions(X_train, y_train, X_test, k_values, n_classes):
+    """Predictions for every k in k_values from a single kneighbors(max_k + 1) query.
+
+    The neighbor lists come back sorted by distance, so the first k columns are
+    the k nearest neighbors for every smaller k. A running vote count along the
+    neighbor axis then gives the uniform-weight vote for each k, and argmax
+    breaks ties towards the lowest class index like KNeighborsClassifier does.
+
+    When the k-th and (k+1)-th neighbors are equidistant, which neighbors make
+    the cut depends on the search order of a k-neighbor query, so those rows
+    are predicted again with a KNeighborsClassifier(n_neighbors=k). That keeps
+    every prediction equal to GridSearchCV's while the one shared query
+    answers almost all rows.
+    """
+    max_k = max(k_values)
+    n_neighbors = min(max_k + 1, len(X_train))
+    model = KNeighborsClassifier(n_neighbors=n_neighbors).fit(X_train, y_train)
+    distances, indices = model.kneighbors(X_test)
+
+    one_hot = y_train[indices][:, :, None] == np.arange(n_classes)
+    running_votes = np.cumsum(one_hot, axis=1, dtype=np.int32)
+
+    predictions = []
+    for k in k_values:
+        preds = running_votes[:, k - 1, :].argmax(axis=1)
+        if k < n_neighbors:
+            boundary = np.flatnonzero(distances[:, k - 1] == distances[:, k])
+            if len(boundary):
+                exact = KNeighborsClassifier(n_neighbors=k).fit(X_train, y_train)
+                preds[boundary] = exact.predict(X_test[boundary])
+        predictions.append(preds)
+    return np.stack(predictions)
+
+
+def check_folds(y, n_splits=5):
+    """Raise ValueError if StratifiedKFold cannot split labels ``y`` into ``n_splits`` folds.
+
+    It needs at least one row per fold, and a strand with at least one row
+    per fold; smaller strands are only spread thinner.
+    """
+    _, counts = np.unique(np.asarray(y), return_counts=True)
+    if len(y) < n_splits or counts.max(initial=0) < n_splits:
+        raise ValueError(
+            f"Dataset needs at least {n_splits} rows, with at least {n_splits} in one strand, "
+            f"for {n_splits}-fold cross-validation; it has {len(y)} rows and at most "
+            f"{counts.max(initial=0)} in a strand"
+        )
+
+
+def sweep_k(X, y, k_values, n_splits=5, random_state=42, n_jobs=1, backend="threading"):
+    """Cross-validate every candidate k with one neighbor query per fold.
+
+    Folds are evaluated in parallel through joblib (``n_jobs`` workers on the
+    given ``backend``). Returns the per-k mean/std and per-fold accuracies, the
+    best k (the smallest k with the highest mean accuracy, as GridSearchCV
+    ranks them), the out-of-fold predictions and confusion matrices of that
+    k, and wall-clock timings of the split, neighbor and scoring phases.
+    """
+    timings = {}
+    started = time.perf_counter()
+    X = np.asarray(X, dtype=float)
+    check_folds(y, n_splits)
+    classes, y_encoded = np.unique(np.asarray(y), return_inverse=True)
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    folds = list(skf.split(X, y_encoded))
+
+    # A k larger than the smallest training fold cannot be fitted at all.
+    smallest_train = min(len(train_idx) for train_idx, _ in folds)
+    k_values = [k for k in k_values if k <= smallest_train] or [smallest_train]
+    timings["split"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fold_preds = Parallel(n_jobs=n_jobs, backend=backend)(
+        delayed(fold_predictions)(X[train_idx], y_encoded[train_idx], X[test_idx], k_values, len(classes))
+        for train_idx, test_idx in folds
+    )
+    timings["neighbors"] = time.perf_counter() - started
+    started = time.perf_counter()
+
+    split_scores = np.array([
+        [np.mean(preds[i] == y_encoded[test_idx]) for preds, (_, test_idx) in zip(fold_preds, folds)]
+        for i in range(len(k_values))
+    ])
+    mean_scores = split_scores.mean(axis=1)
+    std_scores = split_scores.std(axis=1)
+    best = int(np.argmax(mean_scores))
+
+    y_true, y_pred, fold_matrices = [], [], []
+    for preds, (_, test_idx) in zip(fold_preds, folds):
+        fold_true = classes[y_encoded[test_idx]]
+        fold_pred = classes[preds[best]]
+        y_true.extend(fold_true)
+        y_pred.extend(fold_pred)
+        fold_matrices.append(confusion_matrix(fold_true, fold_pred, labels=classes))
+    timings["scoring"] = time.perf_counter() - started
+
+    return {
+        "k_values": k_values,
+        "classes": classes,
+        "n_splits": n_splits,
+        "mean_test_score": mean_scores,
+        "std_test_score": std_scores,
+        "split_test_scores": split_scores,
+        "best_k": k_values[best],
+        "best_score": mean_scores[best],
+        "y_true": y_true,
+        "y_pred": y_pred,
+        "fold_confusion_matrices": fold_matrices,
+        "confusion_matrix": sum(fold_matrices),
+        "timings": timings,
+    }
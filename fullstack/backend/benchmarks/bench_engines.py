@@ -0,0 +1,70 @@
+"""Single-query latency of the KNN neighbor engines, and how often they agree with sklearn.
+
+Run from fullstack/backend:
+
+    python -m benchmarks.bench_engines --rows 1000 10000 100000 --queries 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.KNN import ENGINES, KNN
+from benchmarks.datasets import make_scores
+
+
+def time_queries(engine, queries):
+    latencies = np.empty(len(queries))
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        engine.kneighbors(query[None, :])
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def same_distances(reference, engine, queries):
+    ref_dist, _ = reference.kneighbors(queries)
+    dist, _ = engine.kneighbors(queries)
+    return bool(np.array_equal(ref_dist, dist))
+
+
+def agreement(X, y, k, name, queries):
+    """Share of queries whose predict() votes, tie weights and recommendation match the sklearn engine's.
+
+    Should be 1.0: queries tied at the k-th distance are handed to sklearn.
+    """
+    def outcomes(engine):
+        runner = KNN(None, X.tolist(), y.tolist(), verbose=False)
+        runner.fit(k, None, engine=engine)
+        return [
+            {key: value for key, value in runner.predict(runner.model, [query]).items() if key != "neighbors"}
+            for query in queries.tolist()
+        ]
+    return float(np.mean([a == b for a, b in zip(outcomes("sklearn"), outcomes(name))]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'rows':>8} {'engine':>10} {'p50 us':>9} {'p99 us':>9} {'dist':>5} {'agree':>7}")
+    for rows in args.rows:
+        X, y = make_scores(rows, seed=args.seed)
+        queries = rng.integers(10, 51, size=(args.queries, 3)).astype(float)
+        engines = {name: cls(n_neighbors=args.k).fit(X, y) for name, cls in ENGINES.items()}
+        for name, engine in engines.items():
+            engine.kneighbors(queries[:10])  # warm up
+            latencies = time_queries(engine, queries) * 1e6
+            same = same_distances(engines["sklearn"], engine, queries[:200])
+            agree = agreement(X, y, args.k, name, queries[:200])
+            print(f"{rows:>8} {name:>10} {np.percentile(latencies, 50):>9.1f} "
+                  f"{np.percentile(latencies, 99):>9.1f} {str(same):>5} {agree:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare two benchmark result files.
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Prints the median of every benchmark present in both files and the new/old
+ratio; ratios above --threshold are flagged as regressions and make the
+command exit with status 1.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data["environment"], {(r["name"], r["rows"]): r for r in data["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.10, help="new/old ratio counted as a regression")
+    args = parser.parse_args()
+
+    old_env, old = load(args.old)
+    new_env, new = load(args.new)
+    print(f"old: {old_env.get('commit')}  new: {new_env.get('commit')}\n")
+    print(f"{'benchmark':<26} {'rows':>9} {'old ms':>11} {'new ms':>11} {'ratio':>7}")
+
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]["median_s"], new[key]["median_s"]
+        ratio = after / before if before else float("inf")
+        flag = "  REGRESSION" if ratio > args.threshold else ""
+        regressions += bool(flag)
+        print(f"{key[0]:<26} {key[1]:>9} {before * 1e3:>11.3f} {after * 1e3:>11.3f} {ratio:>7.2f}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Synthetic survey data shaped like real imports.
+
+Respondents answer every question on a 1-5 Likert scale, rate questions of
+their own strand higher, and the strands are imbalanced the way our regional
+datasets are (mostly STEM, fewest ABM).
+"""
+import numpy as np
+
+STRAND_SHARES = {"STEM": 0.45, "HUMSS": 0.35, "ABM": 0.20}
+LONG_NAMES = {
+    "STEM": "Science, Technology, Engineering and Mathematics (STEM)",
+    "HUMSS": "Humanities and Social Sciences (HUMSS)",
+    "ABM": "Accountancy and Business Management (ABM)",
+}
+FEATURE_STRANDS = ["STEM", "ABM", "HUMSS"]  # column order of Data / KNN features
+
+
+def question_texts(questions_per_strand=10):
+    return {
+        strand: [f"{strand} statement {i + 1}: I enjoy activities & tasks of this kind" for i in range(questions_per_strand)]
+        for strand in FEATURE_STRANDS
+    }
+
+
+def make_answers(rows, questions_per_strand=10, seed=42):
+    """Answer matrix (rows, 3 * questions_per_strand) in FEATURE_STRANDS blocks, plus labels."""
+    rng = np.random.default_rng(seed)
+    labels = rng.choice(list(STRAND_SHARES), size=rows, p=list(STRAND_SHARES.values()))
+    answers = np.empty((rows, 3 * questions_per_strand), dtype=np.int8)
+    for block, strand in enumerate(FEATURE_STRANDS):
+        mean = np.where(labels == strand, 3.8, 2.8)[:, None]
+        noise = rng.normal(0.0, 1.0, size=(rows, questions_per_strand))
+        cols = slice(block * questions_per_strand, (block + 1) * questions_per_strand)
+        answers[:, cols] = np.clip(np.rint(mean + noise), 1, 5)
+    return answers, labels
+
+
+def make_scores(rows, questions_per_strand=10, seed=42):
+    """Feature matrix [stem, abm, humss] and strand labels, as KNN receives them."""
+    answers, labels = make_answers(rows, questions_per_strand, seed)
+    X = answers.reshape(rows, 3, questions_per_strand).sum(axis=2, dtype=np.int64)
+    return X, labels
+
+
+def make_survey_rows(rows, questions_per_strand=10, seed=42):
+    """Rows as /import_dataset receives them: question text -> answer, plus the Strand column."""
+    answers, labels = make_answers(rows, questions_per_strand, seed)
+    columns = [text for strand in FEATURE_STRANDS for text in question_texts(questions_per_strand)[strand]]
+    survey = []
+    for answer_row, label in zip(answers.tolist(), labels.tolist()):
+        row = dict(zip(columns, map(str, answer_row)))
+        row["Strand"] = LONG_NAMES[label]
+        survey.append(row)
+    return survey
@@ -0,0 +1,171 @@
+"""Benchmark suite for the KNN service and the dataset import path.
+
+Run from fullstack/backend:
+
+    python -m benchmarks.run                      # 1k, 10k, 100k rows
+    python -m benchmarks.run --sizes 1000 1000000 # up to 1M rows
+    python -m benchmarks.compare old.json new.json
+
+Every run writes a JSON file (environment, settings and one entry per
+benchmark and dataset size) to benchmarks/results/ unless --output is given.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import sklearn
+
+from app.config import Config
+from app.services.KNN import KNN
+from app.services.dataset_import import normalize, ScoringPlan
+from benchmarks.datasets import make_scores, make_survey_rows, question_texts
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(fn, repeats):
+    """Wall-clock seconds of each call; stdout is swallowed so printing code is timed fairly."""
+    timings = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name, rows, timings, calls=1):
+    per_call = [t / calls for t in timings]
+    return {
+        "name": name,
+        "rows": rows,
+        "repeats": len(timings),
+        "calls_per_repeat": calls,
+        "median_s": statistics.median(per_call),
+        "min_s": min(per_call),
+        "max_s": max(per_call),
+    }
+
+
+def split_by_tie(runner, rng, count):
+    """Query samples whose prediction is (and is not) decided by the tie-breaker."""
+    candidates = rng.integers(10, 51, size=(20 * count, 3))
+    tie = np.array([r["tie"] for r in runner.predict_many(runner.model, candidates)])
+    return candidates[tie][:count], candidates[~tie][:count]
+
+
+def bench_size(rows, args, rng):
+    X, y = make_scores(rows, args.questions, seed=args.seed)
+    X, y = X.tolist(), y.tolist()
+    repeats = args.repeats if rows < 100_000 else max(1, args.repeats // 3)
+    results = []
+
+    runner = KNN(None, X, y, verbose=False)
+    results.append(summarize("calculate_k", rows, measure(runner.calculate_k, repeats)))
+    best_k, accuracy = runner.report["best_k"], runner.report["accuracy"]
+
+    sample = [rng.integers(10, 51, size=3).tolist()]
+    results.append(summarize(
+        "start_algorithm_tuned", rows,
+        measure(lambda: KNN(sample, X, y, verbose=False).start_algorithm(), repeats),
+    ))
+    results.append(summarize(
+        "start_algorithm_stored_k", rows,
+        measure(lambda: KNN(sample, X, y, verbose=False).start_algorithm(best_k=best_k, accuracy=accuracy), repeats),
+    ))
+
+    runner.fit(best_k, accuracy)
+    tie_samples, plain_samples = split_by_tie(runner, rng, args.queries)
+    for name, samples in (("predict_tie", tie_samples), ("predict_no_tie", plain_samples)):
+        if len(samples) == 0:
+            continue
+        results.append(summarize(
+            name, rows,
+            measure(lambda: [runner.predict(runner.model, [s]) for s in samples.tolist()], repeats),
+            calls=len(samples),
+        ))
+    batch = rng.integers(10, 51, size=(args.queries, 3))
+    results.append(summarize(
+        "predict_many", rows,
+        measure(lambda: runner.predict_many(runner.model, batch), repeats),
+        calls=len(batch),
+    ))
+
+    import_rows = min(rows, args.import_rows_cap)
+    survey = make_survey_rows(import_rows, args.questions, seed=args.seed)
+    db_questions = {
+        normalize(text): strand
+        for strand, texts in question_texts(args.questions).items() for text in texts
+    }
+    results.append(summarize(
+        "import_score_rows", import_rows,
+        measure(lambda: ScoringPlan(list(survey[0]), db_questions, keyed=True).score(survey), repeats),
+    ))
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "KNN_ENGINE": Config.KNN_ENGINE,
+            "KNN_K_MIN": Config.KNN_K_MIN,
+            "KNN_K_MAX": Config.KNN_K_MAX,
+            "TUNING_N_JOBS": Config.TUNING_N_JOBS,
+            "TUNING_BACKEND": Config.TUNING_BACKEND,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the KNN service and dataset import path.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--questions", type=int, default=10, help="questions per strand")
+    parser.add_argument("--queries", type=int, default=200, help="samples per predict benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--import-rows-cap", type=int, default=200_000,
+                        help="largest survey built for the import benchmark (rows are dicts)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = []
+    for rows in args.sizes:
+        for result in bench_size(rows, args, rng):
+            results.append(result)
+            print(f"{result['name']:<26} {result['rows']:>9} rows  "
+                  f"median {result['median_s'] * 1e3:>10.3f} ms  min {result['min_s'] * 1e3:>10.3f} ms")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(output, "w") as f:
+        json.dump({"environment": environment(), "settings": vars(args), "results": results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Move existing neighbors rows into Results.neighbors_packed.
+
+Run from fullstack/backend:
+
+    python -m migrations.compact_neighbors              # pack existing results
+    python -m migrations.compact_neighbors --drop-rows  # ...and delete the neighbors rows it packed
+
+The column itself is added when the app starts (app/schema.py); this adds
+it too if the app has not run since. Safe to re-run: results that are
+already packed are skipped. Set RESULTS_COMPACT_NEIGHBORS=true afterwards
+so new results are written packed too.
+"""
+import argparse
+
+from sqlalchemy import select, update, delete
+
+from app import create_app, db
+from app.models import Results, Neighbors
+from app.schema import add_missing_columns
+from app.services.neighbor_packing import pack_neighbors
+
+
+def pack_existing(batch_size, drop_rows):
+    """Pack the neighbors rows of unpacked results, one committed batch of results at a time."""
+    last_id, packed_total = 0, 0
+    while True:
+        results_ids = db.session.scalars(
+            select(Results.results_id)
+            .where(Results.results_id > last_id, Results.neighbors_packed.is_(None))
+            .order_by(Results.results_id)
+            .limit(batch_size)
+        ).all()
+        if not results_ids:
+            return packed_total
+        last_id = results_ids[-1]
+
+        grouped = {}
+        for row in db.session.execute(
+            select(Neighbors.results_id, Neighbors.neighbor_index, Neighbors.strand, Neighbors.distance)
+            .where(Neighbors.results_id.in_(results_ids))
+            .order_by(Neighbors.results_id, Neighbors.neighbors_id)
+        ):
+            grouped.setdefault(row.results_id, []).append({
+                "neighbor_index": row.neighbor_index,
+                "strand": row.strand,
+                "distance": row.distance,
+            })
+
+        updates = []
+        for results_id, neighbors in grouped.items():
+            data = pack_neighbors(neighbors)
+            if data is not None:
+                updates.append({"results_id": results_id, "neighbors_packed": data})
+
+        if updates:
+            db.session.execute(update(Results), updates)
+            if drop_rows:
+                db.session.execute(
+                    delete(Neighbors).where(Neighbors.results_id.in_([u["results_id"] for u in updates]))
+                )
+        db.session.commit()
+        packed_total += len(updates)
+        print(f"📦 Packed {packed_total} results (up to results_id {last_id})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--drop-rows", action="store_true", help="delete neighbors rows once packed")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        for column in add_missing_columns():
+            print(f"✅ Added column {column}")
+        packed = pack_existing(args.batch_size, args.drop_rows)
+        print(f"✅ Packed neighbors of {packed} results")
+
+
+if __name__ == "__main__":
+    main()
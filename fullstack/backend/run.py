@@ -1,9 +1,12 @@
 from app import create_app, db
+from app.schema import add_missing_columns
 
 
 app = create_app()
 with app.app_context():
     db.create_all()
+    for column in add_missing_columns():
+        print(f"✅ Added column {column}")
 
 if __name__ == "__main__":
     
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from app.services.KNN import KNN
+from benchmarks.datasets import make_scores
+
+
+@pytest.mark.parametrize("rows, k", [(300, 4), (3000, 6), (3000, 10)])
+def test_predict_many_matches_predict(rows, k):
+    X, y = make_scores(rows, seed=7)
+    samples = np.random.default_rng(7).integers(10, 51, size=(500, 3)).astype(float)
+    runner = KNN(None, X.tolist(), y.tolist(), verbose=False)
+    runner.fit(k, None, engine="sklearn")
+
+    batch = runner.predict_many(runner.model, samples)
+    single = [runner.predict(runner.model, [sample]) for sample in samples.tolist()]
+
+    # Integer totals put votes level and neighbors at the same distance, so
+    # the tie breaker and equidistant k-th neighbors are both exercised
+    assert sum(result["tie"] for result in single) > 0
+    distances, _ = runner.model.kneighbors(samples, n_neighbors=k + 1)
+    assert (distances[:, k - 1] == distances[:, k]).any()
+    assert batch == single
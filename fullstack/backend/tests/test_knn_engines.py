@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from app.services.KNN import GridNeighbors, KNN
+from benchmarks.datasets import make_scores
+
+K = 7
+
+
+def brute_force(X, queries, k):
+    distances = np.sqrt(((queries[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+    order = np.argsort(distances, axis=1, kind="stable")
+    return np.take_along_axis(distances, order, axis=1)[:, :k + 1], order[:, :k + 1]
+
+
+@pytest.mark.parametrize("rows", [50, 1000, 5000])
+def test_grid_neighbors_match_brute_force(rows):
+    X, y = make_scores(rows, seed=3)
+    queries = np.random.default_rng(3).integers(10, 51, size=(300, 3)).astype(float)
+    distances, indices = GridNeighbors(n_neighbors=K).fit(X, y).kneighbors(queries)
+    expected_distances, expected_indices = brute_force(X, queries, K)
+
+    np.testing.assert_array_equal(distances, expected_distances[:, :K])
+    # Equidistant rows are taken in training row order, as a stable sort does
+    np.testing.assert_array_equal(indices, expected_indices[:, :K])
+
+
+@pytest.mark.parametrize("collapse", [False, True])
+def test_grid_engine_predicts_like_sklearn(collapse):
+    X, y = make_scores(2000, seed=5)
+    queries = np.random.default_rng(5).integers(10, 51, size=(400, 3)).astype(float)
+    expected_distances, _ = brute_force(X, queries, K)
+    assert (expected_distances[:, K - 1] == expected_distances[:, K]).any()
+
+    def outcomes(engine):
+        if collapse:
+            runner = KNN.collapsed(None, X, y, verbose=False)
+        else:
+            runner = KNN(None, X.tolist(), y.tolist(), verbose=False)
+        runner.fit(K, None, engine=engine)
+        return [
+            {key: value for key, value in runner.predict(runner.model, [query]).items() if key != "neighbors"}
+            for query in queries.tolist()
+        ]
+
+    assert outcomes("grid") == outcomes("sklearn")
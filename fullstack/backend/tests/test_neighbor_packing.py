@@ -0,0 +1,24 @@
+import math
+
+from app.services.neighbor_packing import pack_neighbors, unpack_neighbors
+
+
+def test_pack_unpack_round_trip():
+    neighbors = [
+        {"neighbor_index": 1, "strand": "STEM", "distance": 0.0},
+        {"neighbor_index": 250, "strand": "HUMSS", "distance": math.sqrt(2)},
+        {"neighbor_index": 2 ** 31 - 1, "strand": "ABM", "distance": 6.324555320336759},
+    ]
+    assert unpack_neighbors(pack_neighbors(neighbors)) == neighbors
+
+
+def test_pack_empty_list():
+    assert unpack_neighbors(pack_neighbors([])) == []
+
+
+def test_unknown_strand_is_not_packed():
+    neighbors = [
+        {"neighbor_index": 1, "strand": "STEM", "distance": 1.0},
+        {"neighbor_index": 2, "strand": "TVL", "distance": 2.0},
+    ]
+    assert pack_neighbors(neighbors) is None
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+
+from app.services.tuning import check_folds, sweep_k
+from benchmarks.datasets import make_scores
+
+K_VALUES = list(range(5, 11))
+
+
+@pytest.mark.parametrize("rows, seed", [(300, 1), (2000, 2), (5000, 1)])
+def test_sweep_k_matches_grid_search(rows, seed):
+    X, y = make_scores(rows, seed=seed)
+    grid = GridSearchCV(
+        KNeighborsClassifier(),
+        {"n_neighbors": K_VALUES},
+        cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
+    ).fit(X, y)
+
+    sweep = sweep_k(X, y, K_VALUES)
+
+    assert sweep["best_k"] == grid.best_params_["n_neighbors"]
+    np.testing.assert_array_equal(sweep["mean_test_score"], grid.cv_results_["mean_test_score"])
+    for j in range(5):
+        np.testing.assert_array_equal(sweep["split_test_scores"][:, j], grid.cv_results_[f"split{j}_test_score"])
+
+
+@pytest.mark.parametrize("labels", [["STEM"] * 4, ["STEM", "ABM", "HUMSS"] * 4])
+def test_sweep_k_rejects_labels_stratified_k_fold_cannot_split(labels):
+    with pytest.raises(ValueError, match="5-fold cross-validation"):
+        sweep_k(np.zeros((len(labels), 3)), labels, K_VALUES)
+
+
+def test_check_folds_allows_a_small_strand():
+    check_folds(["STEM"] * 10 + ["ABM"] * 2)